@@ -0,0 +1,189 @@
+import hashlib
+import io
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+
+def toBytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+class AnalysisCache:
+    def __init__(self, Truss, Tolerance=1e-6, MaxSize=100000, Path=None, CommitEvery=100):
+        """
+        Memoizes the analyses of a truss. Area vectors are quantized to Tolerance, so two vectors that round to the
+        same grid point share one analysis. Results are kept in a bounded in-memory LRU and, if Path is given, in
+        an sqlite file that later runs on the same model reuse. The cache can be used anywhere the truss is
+        analysed, other attributes are forwarded to the truss
+
+        :param Truss: the truss to analyse, startAnalysis must already have been called
+        :param Tolerance: quantization step of the cross-section areas
+        :param MaxSize: maximum number of analyses kept in memory
+        :param Path: sqlite file of the persistent tier, None to keep the cache in memory only
+        :param CommitEvery: number of single analyses stored between commits of the persistent tier, batches are
+            committed at once
+        """
+        self.Truss = Truss
+        self.Tolerance = Tolerance
+        self.MaxSize = MaxSize
+        self.CommitEvery = CommitEvery
+        self.pending = 0  # analyses stored but not committed
+
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+        self.model = self.fingerprint()
+        self.db = None
+        if Path is not None:
+            self.db = sqlite3.connect(Path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS analyses "
+                            "(model TEXT, key BLOB, stress BLOB, mass REAL, disp BLOB, PRIMARY KEY (model, key))")
+
+    def __getattr__(self, name):
+        if name == 'Truss':
+            raise AttributeError(name)
+        return getattr(self.Truss, name)
+
+    def fingerprint(self):
+        """
+        :return: a hash of everything other than the areas that the analysis results depend on
+        """
+        h = hashlib.sha1()
+        for array in (self.Truss.nodes, self.Truss.bars, self.Truss.groupIndex.astype(np.int64), self.Truss.P,
+                      self.Truss.DOFCON, self.Truss.PCases, self.Truss.CombinationFactors):
+            h.update(np.ascontiguousarray(array).tobytes())
+        h.update(repr((self.Truss.E, self.Truss.p, self.Tolerance)).encode())
+        if self.Truss.Catalog is not None:
+            h.update(self.Truss.Catalog.Areas.tobytes())
+            if self.Truss.Catalog.WeightPerLength is not None:
+                h.update(self.Truss.Catalog.WeightPerLength.tobytes())
+        return h.hexdigest()
+
+    def key(self, A, Grouped=False, Discrete=False, LoadCases=False):
+        flags = bytes([Grouped, Discrete, LoadCases])
+        if Discrete:
+            return flags + self.Truss.Catalog.index(A).astype(np.int64).tobytes()
+        return flags + np.round(np.asarray(A) / self.Tolerance).astype(np.int64).tobytes()
+
+    def lookup(self, key):
+        """
+        Finds a cached analysis, first in memory then on disk
+
+        :param key: the quantized area vector
+        :return: (S, Mass, U) or None
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            self.Truss.Profiler.count('cacheHits')
+            return self.memory[key]
+
+        if self.db is not None:
+            row = self.db.execute("SELECT stress, mass, disp FROM analyses WHERE model = ? AND key = ?",
+                                  (self.model, key)).fetchone()
+            if row is not None:
+                result = (np.load(io.BytesIO(row[0])), row[1], np.load(io.BytesIO(row[2])))
+                self.remember(key, result)
+                self.diskHits += 1
+                self.Truss.Profiler.count('cacheDiskHits')
+                return result
+
+        self.misses += 1
+        self.Truss.Profiler.count('cacheMisses')
+        return None
+
+    def remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.MaxSize:
+            self.memory.popitem(last=False)
+
+    def store(self, key, result):
+        self.remember(key, result)
+        if self.db is not None:
+            S, Mass, U = result
+            self.db.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                            (self.model, key, toBytes(S), float(Mass), toBytes(U)))
+            self.pending += 1
+
+    def commit(self):
+        """
+        Writes the stored analyses to the persistent tier
+        """
+        if self.db is not None and self.pending:
+            self.db.commit()
+            self.pending = 0
+
+    def cached(self, analysis, A, Grouped, Discrete, LoadCases):
+        key = self.key(A, Grouped, Discrete, LoadCases)
+        result = self.lookup(key)
+        if result is None:
+            result = analysis(A, Grouped, Discrete)
+            self.store(key, result)
+            if self.pending >= self.CommitEvery:
+                self.commit()
+        S, Mass, U = result
+        return S.copy(), Mass, U.copy()
+
+    def cachedBatch(self, analysis, A, Grouped, Discrete, LoadCases):
+        """
+        Analyses a whole population, running one batched analysis for the design vectors that are not cached
+
+        :param analysis: the batched analysis of the truss to run for the misses
+        :return: stresses, masses and displacements stacked over the population
+        """
+        A = np.atleast_2d(A)
+        keys = [self.key(a, Grouped, Discrete, LoadCases) for a in A]
+        results = [self.lookup(key) for key in keys]
+
+        missing = [i for i in range(len(A)) if results[i] is None]
+        if missing:
+            S, Mass, U = analysis(A[missing], Grouped, Discrete)
+            for j, i in enumerate(missing):
+                results[i] = (S[j].copy(), Mass[j], U[j].copy())
+                self.store(keys[i], results[i])
+            self.commit()
+
+        return (np.array([r[0] for r in results]), np.array([r[1] for r in results]),
+                np.array([r[2] for r in results]))
+
+    def Analysis(self, A, Grouped=False, Discrete=False):
+        return self.cached(self.Truss.Analysis, A, Grouped, Discrete, False)
+
+    def AnalysisBatch(self, A, Grouped=False, Discrete=False):
+        """
+        :param A: cross-section areas, shape [PopSize, NumMembers], or [PopSize, NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in the truss's section catalog
+        :return: stresses [PopSize, NumMembers], masses [PopSize], displacements [PopSize, NumNodes, DOF]
+        """
+        return self.cachedBatch(self.Truss.AnalysisBatch, A, Grouped, Discrete, False)
+
+    def AnalysisLoadCases(self, A, Grouped=False, Discrete=False):
+        return self.cached(self.Truss.AnalysisLoadCases, A, Grouped, Discrete, True)
+
+    def AnalysisLoadCasesBatch(self, A, Grouped=False, Discrete=False):
+        return self.cachedBatch(self.Truss.AnalysisLoadCasesBatch, A, Grouped, Discrete, True)
+
+    def stats(self):
+        """
+        :return: hit and miss counts of the cache
+        """
+        lookups = self.hits + self.diskHits + self.misses
+        return {'hits': self.hits, 'diskHits': self.diskHits, 'misses': self.misses,
+                'hitRate': (self.hits + self.diskHits) / lookups if lookups else 0.0, 'size': len(self.memory)}
+
+    def close(self):
+        """
+        Writes any pending results to the persistent tier and closes it
+        """
+        if self.db is not None:
+            self.commit()
+            self.db.close()
+            self.db = None
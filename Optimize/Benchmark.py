@@ -0,0 +1,274 @@
+"""
+Benchmarks the analyses and optimizers on reference and generated trusses. The module is part of the Optimize
+package, so run it as `python -m Optimize.Benchmark` from the folder holding the package, `python Benchmark.py` can
+not resolve its imports
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import TrussAnalysis
+from . import Optimization
+from . import CostFunction
+from . import ModelFile
+from . import TrussGenerator
+
+BridgeDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SAP_OPTIMIZATION')
+
+
+def scriptTruss(script):
+    """
+    Builds a truss from the module level nodes, bars, P and DOFCON of one of the analysis scripts of the repo, so
+    the benchmarks analyse the same models the scripts do
+
+    :param script: the imported script
+    :return: the truss, ready to be analysed
+    """
+    fixed = np.nonzero((script.DOFCON == 0).any(axis=1))[0]
+    node, direction = np.nonzero(script.P)
+
+    t = TrussAnalysis.Truss()
+    t.E = script.E
+    t.p = getattr(script, 'p', t.p)
+    t.setModel(script.nodes, script.bars, supports=np.column_stack((fixed, script.DOFCON[fixed])),
+               forces=np.column_stack((node, direction, script.P[node, direction])))
+    t.startAnalysis()
+    return t
+
+
+def tenBar():
+    """
+    The 10-bar truss of SizeOfTurssOptimizer.py
+
+    :return: the truss, ready to be analysed
+    """
+    import SizeOfTurssOptimizer
+
+    return scriptTruss(SizeOfTurssOptimizer)
+
+
+def fifteenBar():
+    """
+    The 15-bar truss of TrussAnalysi.py
+
+    :return: the truss, ready to be analysed
+    """
+    import TrussAnalysi
+
+    return scriptTruss(TrussAnalysi)
+
+
+def readBridge(directory=BridgeDirectory, CachePath=None, Cache=False):
+    """
+    Reads the sheets of the bridge the same way SAP_OPTIMIZATION/Truss.readIn does
+
+    :param directory: folder of the Excel files
+    :param CachePath: path of the binary model file, see ModelFile.readSheets
+    :param Cache: if True the model file is used
+    :return: {sheet: {column: array}}
+    """
+    return ModelFile.readSheets(directory, CachePath=CachePath, Cache=Cache)
+
+
+def benchmarkBridge(MinTime=0.5):
+    """
+    Benchmarks one analysis of the bridge with SAP_OPTIMIZATION.FrameSolver. The bridge is a frame, pin-jointed it
+    is a mechanism, so it is not run through the truss benchmarks
+
+    :param MinTime: minimum time spent on the benchmark
+    :return: {'members', 'freeDOF', 'sparse', 'benchmarks'} like the other models
+    """
+    from .SAP_OPTIMIZATION import Truss
+
+    bridge = Truss.Truss(276, 25.5, 8, Solver='frame')
+    sections = ['R1'] * (int(np.max(bridge.CSGroup)) + 1)
+    with contextlib.redirect_stdout(io.StringIO()):  # Truss.saveResults prints every analysis
+        analysis = measure(lambda: bridge.anaylize(sections, 0, 0), MinTime)
+    return {'members': len(bridge.members), 'freeDOF': len(bridge.Frame.freeDOF), 'sparse': False,
+            'benchmarks': {'Analysis': analysis}}
+
+
+def measure(function, MinTime=0.5, MinRepeats=3):
+    """
+    Times a function by calling it until MinTime has passed, then measures its peak memory in a separate call so
+    tracemalloc does not slow down the timing
+
+    :param function: function taking no arguments
+    :param MinTime: minimum time to spend calling the function
+    :param MinRepeats: minimum number of calls
+    :return: {'calls', 'seconds', 'perSecond', 'peakMemory'} with the peak memory in bytes
+    """
+    function()  # warm up caches and lazy imports
+
+    calls = 0
+    start = time.perf_counter()
+    while calls < MinRepeats or time.perf_counter() - start < MinTime:
+        function()
+        calls += 1
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'calls': calls, 'seconds': seconds, 'perSecond': calls / seconds, 'peakMemory': peak}
+
+
+def benchmarkModel(t, PopSize=20, MinTime=0.5, seed=0):
+    """
+    Benchmarks the single and batched analyses, the cost function and one iteration of the swarm on a truss
+
+    :param t: the truss
+    :param PopSize: size of the population of the batched benchmarks
+    :param MinTime: minimum time spent on each benchmark
+    :param seed: seed of the random areas
+    :return: {benchmark name: measurement}, rates are in analyses per second
+    """
+    rng = np.random.default_rng(seed)
+    NumMembers = len(t.bars)
+    A = rng.uniform(1, 35, NumMembers)
+    APop = rng.uniform(1, 35, [PopSize, NumMembers])
+    cost = CostFunction.CostFunction(25)
+    S, Mass, U = t.AnalysisBatch(APop)
+
+    results = {'Analysis': measure(lambda: t.Analysis(A), MinTime),
+               'AnalysisBatch': measure(lambda: t.AnalysisBatch(APop), MinTime),
+               'CostFunction': measure(lambda: cost.Evaluate(Mass, U, S), MinTime)}
+    for name in ('AnalysisBatch', 'CostFunction'):
+        results[name]['perSecond'] *= PopSize
+
+    for name, Synchronous in (('SwarmIteration', True), ('ParticleIteration', False)):
+        pso = Optimization.ParticalSwarmOptimization(NumMembers, len(t.nodes), NumMembers, 0.1, 35, 1000, PopSize,
+                                                     25, t, Synchronous=Synchronous, Seed=seed)
+        update = pso.updateSwarm if Synchronous else pso.updateParticles
+        iteration = iter(range(10 ** 9))
+        results[name] = measure(lambda: update(next(iteration) % pso.MaxIt), MinTime)
+        results[name]['perSecond'] *= PopSize
+
+    return results
+
+
+def Run(MaxMembers=10000, PopSize=20, MinTime=0.5):
+    """
+    Runs the benchmark suite on the models of the repo and on generated Pratt trusses of about 10^2 up to
+    MaxMembers members
+
+    :param MaxMembers: largest generated truss
+    :param PopSize: size of the population of the batched benchmarks
+    :param MinTime: minimum time spent on each benchmark
+    :return: the results, ready to be saved as JSON
+    """
+    results = {'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                           'processor': platform.processor(), 'system': platform.system()},
+               'readIn': measure(readBridge, MinTime),
+               'models': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        CachePath = os.path.join(directory, 'Model.npz')
+        results['readInCached'] = measure(lambda: readBridge(CachePath=CachePath, Cache=True), MinTime)
+
+    models = {'tenBar': tenBar(), 'fifteenBar': fifteenBar()}
+    size = 100
+    while size <= MaxMembers:
+        models['generated%d' % size] = TrussGenerator.Pratt(size // 4, Groups='member')
+        size *= 10
+
+    for name, t in models.items():
+        results['models'][name] = {'members': len(t.bars), 'freeDOF': int(t.NumFree), 'sparse': bool(t.useSparse),
+                                   'benchmarks': benchmarkModel(t, PopSize, MinTime)}
+    results['models']['bridge'] = benchmarkBridge(MinTime)
+
+    for name, data in results['models'].items():
+        print(name, data['members'], "members,", "%.0f analyses/s" % data['benchmarks']['Analysis']['perSecond'])
+    return results
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, Tolerance=0.2):
+    """
+    Compares results with a baseline
+
+    :param results: results of Run
+    :param baseline: results of an earlier Run
+    :param Tolerance: relative loss of speed or gain of peak memory that counts as a regression
+    :return: list of (model, benchmark, measurement, baseline value, new value) of the regressions
+    """
+    regressions = []
+    for model, data in results['models'].items():
+        if model not in baseline['models']:
+            continue
+        for benchmark, new in data['benchmarks'].items():
+            old = baseline['models'][model]['benchmarks'].get(benchmark)
+            if old is None:
+                continue
+            if new['perSecond'] < (1 - Tolerance) * old['perSecond']:
+                regressions.append((model, benchmark, 'perSecond', old['perSecond'], new['perSecond']))
+            if new['peakMemory'] > (1 + Tolerance) * old['peakMemory']:
+                regressions.append((model, benchmark, 'peakMemory', old['peakMemory'], new['peakMemory']))
+    return regressions
+
+
+def PlotScaling(results, benchmarks=('Analysis', 'AnalysisBatch', 'SwarmIteration')):
+    """
+    Plots analyses per second and peak memory against the number of members of the generated trusses
+    """
+    import matplotlib.pyplot as plt
+
+    models = sorted((data for name, data in results['models'].items() if name.startswith('generated')),
+                    key=lambda data: data['members'])
+    members = [data['members'] for data in models]
+
+    fig, (speed, memory) = plt.subplots(1, 2, figsize=(10, 4))
+    for benchmark in benchmarks:
+        speed.loglog(members, [data['benchmarks'][benchmark]['perSecond'] for data in models], 'o-', label=benchmark)
+        memory.loglog(members, [data['benchmarks'][benchmark]['peakMemory'] for data in models], 'o-',
+                      label=benchmark)
+    speed.set_xlabel("Number of members")
+    speed.set_ylabel("Analyses per second")
+    memory.set_xlabel("Number of members")
+    memory.set_ylabel("Peak memory [bytes]")
+    speed.legend()
+    plt.show()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks the truss analysis and the optimizers")
+    parser.add_argument('--output', default='benchmark.json', help="file the results are saved to")
+    parser.add_argument('--baseline', help="results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="relative change that counts as a regression")
+    parser.add_argument('--max-members', type=int, default=10000, help="largest generated truss")
+    parser.add_argument('--pop-size', type=int, default=20)
+    parser.add_argument('--min-time', type=float, default=0.5, help="seconds spent on each benchmark")
+    parser.add_argument('--plot', action='store_true', help="plot the scaling curves")
+    args = parser.parse_args()
+
+    results = Run(args.max_members, args.pop_size, args.min_time)
+    save(results, args.output)
+
+    if args.baseline is not None:
+        regressions = compare(results, load(args.baseline), args.tolerance)
+        for model, benchmark, measurement, old, new in regressions:
+            print("Regression:", model, benchmark, measurement, "%.4g -> %.4g" % (old, new))
+        if regressions:
+            raise SystemExit(1)
+
+    if args.plot:
+        PlotScaling(results)
@@ -0,0 +1,80 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from . import Main
+from . import Optimization
+from . import Profiler
+from . import TrussAnalysis
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m Optimize',
+                                     description="Optimizes the cross-sections of a truss with the particle swarm, "
+                                                 "without opening any windows")
+    parser.add_argument('model', help="folder holding the Nodes.xlsx and Members.xlsx of the truss")
+    parser.add_argument('output', help="JSON file the results are written to")
+    parser.add_argument('--amin', type=float, default=0.1, help="minimum cross-section area")
+    parser.add_argument('--amax', type=float, default=40, help="maximum cross-section area")
+    parser.add_argument('--stress-limit', type=float, default=25)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--pop-size', type=int, default=30)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--synchronous', action='store_true', help="move and evaluate the whole swarm at once")
+    parser.add_argument('--workers', type=int, default=0, help="number of worker processes")
+    parser.add_argument('--load-cases', action='store_true', help="score the worst load combination")
+    parser.add_argument('--stagnation', type=int, help="stop after this many iterations without improvement")
+    parser.add_argument('--max-time', type=float, help="wall-clock budget in seconds")
+    parser.add_argument('--max-analyses', type=int, help="budget of truss analyses")
+    parser.add_argument('--checkpoint', help="file the run is checkpointed to")
+    parser.add_argument('--checkpoint-every', type=int, default=10)
+    parser.add_argument('--resume', action='store_true', help="continue the run saved in --checkpoint")
+    parser.add_argument('--profile', help="file the per iteration profile is exported to (.csv or .json)")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    """
+    Loads the model and runs the optimization described by the parsed arguments
+
+    :param args: the arguments from parseArguments
+    :return: the results, ready to be saved as JSON
+    """
+    t = TrussAnalysis.Truss()
+    Main.readIn(t, args.model)
+    t.startAnalysis()
+    if args.profile is not None:
+        t.Profiler = Profiler.Profiler()
+
+    start = time.perf_counter()
+    if args.resume:
+        a = Optimization.ParticalSwarmOptimization.Resume(args.checkpoint, t, Workers=args.workers or None)
+    else:
+        a = Optimization.ParticalSwarmOptimization(len(t.bars), len(t.nodes), t.NumGroups, args.amin, args.amax,
+                                                   args.iterations, args.pop_size, args.stress_limit, t,
+                                                   Synchronous=args.synchronous, Seed=args.seed,
+                                                   Workers=args.workers, LoadCases=args.load_cases)
+    a.Evaluate(StagnationIterations=args.stagnation, MaxTime=args.max_time, MaxAnalyses=args.max_analyses,
+               CheckpointPath=args.checkpoint, CheckpointEvery=args.checkpoint_every)
+    seconds = time.perf_counter() - start
+
+    if args.profile is not None:
+        t.Profiler.export(args.profile)
+
+    Stress, Mass, Disp = a.analyse(a.gBestAreas)
+    return {'bestAreas': a.gBestAreas.tolist(), 'bestCost': float(a.gBestCost),
+            'stress': np.asarray(Stress).tolist(), 'mass': float(Mass), 'displacement': np.asarray(Disp).tolist(),
+            'costHistory': a.BestCost.tolist(), 'iterations': a.Iteration, 'analyses': a.NumAnalyses,
+            'stopReason': a.StopReason, 'seconds': seconds}
+
+
+def main(argv=None):
+    args = parseArguments(argv)
+    if args.resume and args.checkpoint is None:
+        raise SystemExit("--resume needs --checkpoint")
+    results = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print("Best cost", results['bestCost'], "after", results['analyses'], "analyses")
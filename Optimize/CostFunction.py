@@ -0,0 +1,61 @@
+import numpy as np
+
+
+class CostFunction:
+    def __init__(self, stressLimit, weightExponent=1.8, weightFactor=75, deflectionFactor=0.95 * 4000000,
+                 deflectionAxis=1):
+        """
+        Cost of a truss: a weight term plus a maximum deflection term, scaled up by the stress violations
+
+        :param stressLimit: allowable stress magnitude
+        :param weightExponent: exponent applied to the weight
+        :param weightFactor: multiplier of the weight term
+        :param deflectionFactor: multiplier of the maximum deflection
+        :param deflectionAxis: displacement component used for the deflection (1 = y)
+        """
+        self.StressLimit = stressLimit
+        self.WeightExponent = weightExponent
+        self.WeightFactor = weightFactor
+        self.DeflectionFactor = deflectionFactor
+        self.DeflectionAxis = deflectionAxis
+
+    def __call__(self, weight, deflection, stress):
+        return self.Evaluate(weight, deflection, stress)
+
+    def Evaluate(self, weight, deflection, stress):
+        """
+        Calculates the cost of one truss or of a whole population at once. Any leading axes are treated as the
+        population. Singular structures, analysed as NaN displacements, get an infinite cost
+
+        :param weight: total weight of the truss, shape [...]
+        :param deflection: deflections of all the nodes of the truss, shape [..., NumNodes, DOF]
+        :param stress: stresses in all the members of the truss, shape [..., NumMembers]
+        :return: cost of the truss, shape [...]
+        """
+        stress = np.asarray(stress)
+        deflection = np.asarray(deflection)
+
+        # adding cost if a member is exceding the stree limit
+        violation = np.abs((stress - self.StressLimit) / self.StressLimit)
+        C_total = np.where(np.abs(stress) > self.StressLimit, violation, 0).sum(axis=-1)
+
+        # finding the maximum vertical deflection
+        maxDif = np.abs(deflection[..., self.DeflectionAxis]).max(axis=-1)
+
+        # calculating cost
+        Cs = np.asarray(weight) ** self.WeightExponent * self.WeightFactor + self.DeflectionFactor * maxDif
+
+        cost = Cs * (1 + C_total)
+        return np.where(np.isnan(cost), np.inf, cost)
+
+    def EvaluateEnvelope(self, weight, deflection, stress):
+        """
+        Calculates the worst cost over the load combinations of one truss or of a whole population
+
+        :param weight: total weight of the truss, shape [...]
+        :param deflection: deflections of all the nodes for every combination, shape [..., NumCombinations,
+            NumNodes, DOF]
+        :param stress: stresses in all the members for every combination, shape [..., NumCombinations, NumMembers]
+        :return: cost of the truss, shape [...]
+        """
+        return self.Evaluate(np.asarray(weight)[..., np.newaxis], deflection, stress).max(axis=-1)
@@ -0,0 +1,115 @@
+import numpy as np
+from scipy.optimize import minimize
+
+
+class GradientSizingOptimization:
+
+    def __init__(self, Truss, AMin, AMax, stressLimit, deflectionLimit, Grouped=False, MaxIterations=100,
+                 Tolerance=1e-6, deflectionAxis=1):
+        """
+        Sizes the truss with SLSQP using the analytic sensitivities of Truss.Sensitivities. It minimizes the
+        weight subject to the stress limit and a limit on the deflections, which takes tens of analyses where the
+        particle swarm takes thousands
+
+        :param Truss: the truss to optimize, startAnalysis must already have been called
+        :param AMin: minimum cross-section area
+        :param AMax: maximum cross-section area
+        :param stressLimit: allowable stress magnitude
+        :param deflectionLimit: allowable deflection magnitude
+        :param Grouped: if True one area is optimized per cross-section group
+        :param MaxIterations: maximum number of SLSQP iterations
+        :param Tolerance: SLSQP convergence tolerance
+        :param deflectionAxis: displacement component the deflection limit applies to (1 = y)
+        """
+        self.Truss = Truss
+        self.AMin, self.AMax = AMin, AMax
+        self.StressLimit = stressLimit
+        self.DeflectionLimit = deflectionLimit
+        self.Grouped = Grouped
+        self.MaxIterations = MaxIterations
+        self.Tolerance = Tolerance
+        self.DeflectionAxis = deflectionAxis
+
+        self.NumVariables = Truss.NumGroups if Grouped else len(Truss.bars)
+        self.NumAnalyses = 0
+        self.History = []  # weight after each iteration
+
+        self.lastA = None
+        self.lastResults = None
+
+        self.Areas = None
+        self.Mass = None
+        self.Result = None
+
+    def analyse(self, A):
+        """
+        Analyses the truss with sensitivities, reusing the results when SLSQP asks again for the same areas
+
+        :param A: the design variables
+        :return: S, Mass, U, dS, dMass, dU
+        """
+        if self.lastA is None or not np.array_equal(A, self.lastA):
+            self.lastA = np.copy(A)
+            self.lastResults = self.Truss.Sensitivities(A, self.Grouped)
+            self.NumAnalyses += 1
+        return self.lastResults
+
+    def weight(self, A):
+        return self.analyse(A)[1]
+
+    def weightGradient(self, A):
+        return self.analyse(A)[4]
+
+    def constraints(self, A):
+        """
+        Normalized constraints, feasible when all are >= 0
+
+        :param A: the design variables
+        :return: stress constraints in tension and compression, then deflection constraints in both directions
+        """
+        S, Mass, U, dS, dMass, dU = self.analyse(A)
+        free = self.Truss.DOFCON[:, self.DeflectionAxis] == 1
+        d = U[free, self.DeflectionAxis]
+        return np.concatenate((1 - S / self.StressLimit, 1 + S / self.StressLimit,
+                               1 - d / self.DeflectionLimit, 1 + d / self.DeflectionLimit))
+
+    def constraintsGradient(self, A):
+        S, Mass, U, dS, dMass, dU = self.analyse(A)
+        free = self.Truss.DOFCON[:, self.DeflectionAxis] == 1
+        dd = dU[free, self.DeflectionAxis]
+        return np.concatenate((-dS / self.StressLimit, dS / self.StressLimit,
+                               -dd / self.DeflectionLimit, dd / self.DeflectionLimit))
+
+    def Evaluate(self, A0=None):
+        """
+        Optimizes the given truss
+
+        :param A0: starting areas, defaults to the maximum area
+        :return: the optimal areas
+        """
+        if A0 is None:
+            A0 = np.full(self.NumVariables, self.AMax, dtype=float)
+
+        self.Result = minimize(self.weight, A0, jac=self.weightGradient, method='SLSQP',
+                               bounds=[(self.AMin, self.AMax)] * self.NumVariables,
+                               constraints=[{'type': 'ineq', 'fun': self.constraints, 'jac': self.constraintsGradient}],
+                               callback=lambda A: self.History.append(self.weight(A)),
+                               options={'maxiter': self.MaxIterations, 'ftol': self.Tolerance})
+
+        self.Areas = self.Result.x
+        self.Mass = self.weight(self.Areas)
+        return self.Areas
+
+    def Plot(self):
+        import matplotlib.pyplot as plt
+
+        plt.plot(self.History)
+        print("Design Variables A[in2]")
+        print(self.Areas[np.newaxis].T)
+        Stress, Mass, Disp = self.Truss.Analysis(self.Areas, self.Grouped)
+        print("stress [ksi]")
+        print(Stress[np.newaxis].T)
+        print("Displacement [in]")
+        print(Disp)
+        print("Weight =", Mass, "after", self.NumAnalyses, "analyses")
+        plt.show()
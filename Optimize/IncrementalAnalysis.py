@@ -0,0 +1,99 @@
+import numpy as np
+
+from . import TrussAnalysis
+
+
+class IncrementalAnalysis:
+    def __init__(self, Truss, MaxChanges=10):
+        """
+        Re-analyses a truss cheaply when only a few member areas change. Each member adds A_k b_k b_k^T to the
+        stiffness, so changing c members is a rank-c update of the last factorized stiffness, solved with the
+        Woodbury identity instead of a new factorization
+
+        :param Truss: the truss to analyse, startAnalysis must already have been called
+        :param MaxChanges: number of changed members above which Kff is factorized again instead of updated
+        """
+        self.Truss = Truss
+        self.MaxChanges = MaxChanges
+
+        self.A0 = None  # areas of the factorized stiffness
+        self.solve0 = None
+        self.Uf0 = None
+        self.Z = {}  # K0^-1 b_k of the members used in updates since the last factorization
+
+        self.Feasible = None  # whether the last analysed structure was stable
+        self.refactorizations = 0
+        self.updates = 0
+
+    def refactor(self, A):
+        """
+        Factorizes Kff for the given areas and makes them the base of later updates
+
+        :param A: cross-section areas, shape [NumMembers]
+        """
+        self.A0 = np.array(A, dtype=float)
+        self.solve0 = self.Truss.factorize(self.A0)
+        self.Uf0 = self.solve0(self.Truss.Pf)
+        self.Z = {}
+        self.refactorizations += 1
+
+    def solveUpdate(self, A, changed):
+        """
+        Solves (K0 + B diag(dA) B^T) Uf = Pf with the Woodbury identity. Raises LinAlgError if the capacitance
+        matrix is ill conditioned, as it is when a changed area drops to near zero, so that the stiffness is
+        factorized again and checked like any other
+
+        :param A: cross-section areas, shape [NumMembers]
+        :param changed: indices of the members whose areas differ from A0
+        :return: Uf
+        """
+        missing = [k for k in changed if k not in self.Z]
+        if missing:
+            Zmissing = self.solve0(self.Truss.memberVectors(missing))
+            for j, k in enumerate(missing):
+                self.Z[k] = Zmissing[:, j]
+
+        B = self.Truss.memberVectors(changed)
+        Z = np.column_stack([self.Z[k] for k in changed])
+        dA = A[changed] - self.A0[changed]
+
+        capacitance = np.eye(len(changed)) + dA[:, np.newaxis] * (B.T @ Z)
+        if np.linalg.cond(capacitance) * self.Truss.SingularTolerance > 1:
+            raise np.linalg.LinAlgError("The capacitance matrix is nearly singular")
+        y = np.linalg.solve(capacitance, dA * (B.T @ self.Uf0))
+        self.updates += 1
+        return self.Uf0 - Z @ y
+
+    def Analysis(self, A, Grouped=False, Discrete=False):
+        """
+        A singular structure gives NaN displacements and sets self.Feasible to False, as in Truss.solve
+
+        :param A: cross-section areas, shape [NumMembers], or [NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in the truss's section catalog instead of areas
+        :return: stresses [NumMembers], mass, displacements [NumNodes, DOF]
+        """
+        A, MassPerLength = self.Truss.sectionProperties(A, Grouped, Discrete)
+        changed = [] if self.A0 is None else np.nonzero(A != self.A0)[0]
+
+        try:
+            if self.A0 is None or len(changed) > self.MaxChanges:
+                self.refactor(A)
+                Uf = self.Uf0
+            elif len(changed) == 0:
+                Uf = self.Uf0
+            else:
+                try:
+                    Uf = self.solveUpdate(A, changed)
+                except np.linalg.LinAlgError:
+                    self.refactor(A)
+                    Uf = self.Uf0
+            self.Feasible = True
+        except TrussAnalysis.SingularStiffness:
+            self.A0 = None
+            Uf = np.full(self.Truss.NumFree, np.nan)
+            self.Feasible = False
+            self.Truss.SingularSolves += 1
+            self.Truss.Profiler.count('singularSolves')
+
+        return self.Truss.recoverResults(Uf, MassPerLength)
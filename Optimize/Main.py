@@ -1,56 +1,70 @@
+"""
+Reads a truss from Nodes.xlsx and Members.xlsx, draws it and optimizes its cross-sections. The module is part of
+the Optimize package, so run it as `python -m Optimize.Main` from the folder holding the package and the
+spreadsheets, `python Main.py` can not resolve its imports
+"""
 import numpy as np
 
-import Optimization
-import TrussAnalysis
-import pandas as pd
-import openpyxl
+from . import ModelFile
+from . import Optimization
+from . import TrussAnalysis
 
-def readIn(truss):
-    NodsXlsx = pd.read_excel('Nodes.xlsx')
 
-    x = list(NodsXlsx['X'])
-    y = list(NodsXlsx['Y'])
-    Suport = list(NodsXlsx['Support'])
-    ForceMag = list(NodsXlsx['ForceMag'])
-    ForceDir = list(NodsXlsx['ForceDir'])
+def readIn(truss, directory='.', Cache=True):
+    """
+    Reads the truss from Nodes.xlsx (X, Y, Support, ForceMag, ForceDir columns) and Members.xlsx (Node1, Node2,
+    Cross-Section Group columns). The arrays of the model are built straight from the columns and set on the truss
+    at once, and the sheets are cached in a binary model file in the folder
 
-    for i in range(len(x)):
-        truss.addNode([x[i], y[i]])
-        truss.addSuport(i, Suport[i])
-        if ForceMag[i] != 0:
-            truss.addPointForce(i,ForceDir[i],ForceMag[i])
+    :param truss: the truss to set the nodes and members of
+    :param directory: folder of the Excel files
+    :param Cache: if False the spreadsheets are read every time, see ModelFile.readSheets
+    """
+    columns = ModelFile.readSheets(directory, Cache=Cache)
+    Nodes, Members = columns['Nodes'], columns['Members']
 
-    MembersXlsx = pd.read_excel('Members.xlsx')
+    nodes = np.column_stack((Nodes['X'], Nodes['Y']))
 
-    Node1 = list(MembersXlsx['Node1'])
-    Node2 = list(MembersXlsx['Node2'])
-    CorssSectionGroup = list(MembersXlsx['Cross-Section Group'])
+    # [x, y] of each addSuport type with 1 = free and 0 = fixed, other types add no support
+    SuportTypes = np.array([[0, 0], [1, 1], [1, 0]])
+    Suport = np.asarray(Nodes['Support'], dtype=int)
+    supported = np.nonzero((Suport >= 0) & (Suport < len(SuportTypes)))[0]
+    supports = np.column_stack((supported, SuportTypes[Suport[supported]]))
 
-    for i in range(len(Node1)):
-        truss.addMember([Node1[i], Node2[i]], CorssSectionGroup[i])
+    loaded = np.nonzero(Nodes['ForceMag'] != 0)[0]
+    forces = np.column_stack((loaded, Nodes['ForceDir'][loaded], Nodes['ForceMag'][loaded]))
 
-AMin = 0.1
-AMax = 40
-MaxItervals = 500
-PopSize = 30
-stressLimit = 25
+    bars = np.column_stack((Members['Node1'], Members['Node2']))
+    truss.setModel(nodes, bars, Members['Cross-Section Group'], supports, forces)
 
-t = TrussAnalysis.Truss()
-readIn(t)
 
-NumMembers = len(t.m)
-A = np.zeros(NumMembers)
-for i in range(NumMembers):
-    A[i] = 5
+def main():
+    AMin = 0.1
+    AMax = 40
+    MaxItervals = 500
+    PopSize = 30
+    stressLimit = 25
 
-t.startAnalysis()
-[S, Mass, U] = t.Analysis(A)
-t.Draw(U, 50)
+    t = TrussAnalysis.Truss()
+    readIn(t)
 
-NumMembers = len(t.m)
-NumCrossSections = NumMembers
-NumNodes  = len(t.n)
+    NumMembers = len(t.m)
+    A = np.zeros(NumMembers)
+    for i in range(NumMembers):
+        A[i] = 5
 
-a = Optimization.ParticalSwarmOptimization(NumMembers, NumNodes, NumCrossSections, AMin, AMax, MaxItervals, PopSize, stressLimit, t)
-a.Evaluate()
-a.Plot()
\ No newline at end of file
+    t.startAnalysis()
+    [S, Mass, U] = t.Analysis(A)
+    t.Draw(U, 50)
+
+    NumMembers = len(t.m)
+    NumCrossSections = t.NumGroups
+    NumNodes  = len(t.n)
+
+    a = Optimization.ParticalSwarmOptimization(NumMembers, NumNodes, NumCrossSections, AMin, AMax, MaxItervals, PopSize, stressLimit, t)
+    a.Evaluate()
+    a.Plot()
+
+
+if __name__ == "__main__":
+    main()
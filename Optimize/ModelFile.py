@@ -0,0 +1,112 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+
+def fingerprint(paths):
+    """
+    :param paths: paths of the source files
+    :return: hash of the contents of the files
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def readCache(path, source):
+    """
+    Reads the columns from a model file
+
+    :param path: path of the model file
+    :param source: fingerprint of the spreadsheets the columns must come from
+    :return: {sheet: {column: array}}, or None if the file is missing, unreadable or from other spreadsheets
+    """
+    try:
+        with np.load(path) as data:
+            if str(data['source']) != source:
+                return None
+            columns = {}
+            for key in data.files:
+                if key != 'source':
+                    sheet, name = key.split('/', 1)
+                    columns.setdefault(sheet, {})[name] = data[key]
+            return columns
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def writeCache(path, source, columns):
+    """
+    Writes the columns to a model file, through a temporary file of its own so an interrupted write can not leave
+    a corrupt model behind and processes reading the sheets at once do not write over each other. A folder that can
+    not be written to is skipped silently, the spreadsheets are then read every time
+
+    :param path: path of the model file
+    :param source: fingerprint of the spreadsheets
+    :param columns: {sheet: {column: array}}
+    """
+    arrays = {sheet + '/' + name: values for sheet, sheetColumns in columns.items()
+              for name, values in sheetColumns.items()}
+    try:
+        descriptor, temporary = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            np.savez(f, source=source, **arrays)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def readSheets(directory, sheets=('Nodes', 'Members'), CachePath=None, Cache=True):
+    """
+    Reads whole columns of Excel sheets as arrays. The first read converts the sheets to a binary model file that
+    later reads load instead, until the spreadsheets change
+
+    :param directory: folder of the Excel files, one file per sheet named <sheet>.xlsx
+    :param sheets: names of the sheets
+    :param CachePath: path of the model file, defaults to Model.npz in the folder
+    :param Cache: if False the spreadsheets are always read and no model file is written
+    :return: {sheet: {column: array}}
+    """
+    paths = [os.path.join(directory, sheet + '.xlsx') for sheet in sheets]
+    if CachePath is None:
+        CachePath = os.path.join(directory, 'Model.npz')
+
+    source = fingerprint(paths) + ' ' + ' '.join(sheets)
+    if Cache:
+        columns = readCache(CachePath, source)
+        if columns is not None:
+            return columns
+
+    import pandas as pd
+
+    columns = {}
+    for sheet, path in zip(sheets, paths):
+        frame = pd.read_excel(path)
+        columns[sheet] = {}
+        for name in frame.columns:
+            values = frame[name].to_numpy()
+            columns[sheet][str(name)] = values.astype(str) if values.dtype == object else values
+
+    if Cache:
+        writeCache(CachePath, source, columns)
+    return columns
+
+
+def nodeIndex(Number):
+    """
+    :param Number: the number of each node as written in the sheets
+    :return: array mapping a node number to its row
+    """
+    Number = np.asarray(Number, dtype=int)
+    index = np.full(Number.max() + 1, -1)
+    index[Number] = np.arange(len(Number))
+    return index
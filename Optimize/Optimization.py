@@ -1,91 +1,351 @@
+import json
+import os
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
-import TrussAnalysis
+
+from . import AnalysisCache
+from . import CostFunction
+from . import ParallelEvaluation
 
 class ParticalSwarmOptimization:
 
-    def __init__(self, NumMembers, NumNodes, NumCrossSections, AMin, AMax, MaxItervals, PopSize, stressLimit, Truss):
+    def __init__(self, NumMembers, NumNodes, NumCrossSections, AMin, AMax, MaxItervals, PopSize, stressLimit, Truss,
+                 Synchronous=False, Seed=None, Cost=None, Workers=0, Discrete=False, LoadCases=False, Initialize=True):
+        """
+        :param NumCrossSections: number of cross-section groups. If it differs from NumMembers one area is searched
+            for per group of the truss and expanded to the members in the analysis
+        :param Synchronous: if True the whole swarm is moved at once each iteration and evaluated with one batched
+            analysis, otherwise particles are moved and evaluated one at a time
+        :param Seed: seed of the random number generator
+        :param Cost: CostFunction used to score the trusses, defaults to one built from stressLimit
+        :param Workers: if more than 0 each iteration is moved and evaluated synchronously across that many worker
+            processes, each chunk of the swarm drawing from its own seeded random stream
+        :param Discrete: if True the sections are picked from Truss.Catalog. The swarm then searches over catalog
+            positions and AMin and AMax are replaced by the first and last catalog index
+        :param LoadCases: if True every load combination of the truss is analysed and the worst one is scored
+        :param Initialize: if False the swarm is not created or evaluated, used by Resume to fill it from a checkpoint
+        """
         self.Truss = Truss
+        self.Profiler = Truss.Profiler  # shared with the truss so one profile covers the whole run
+        self.Synchronous = Synchronous
+        self.Entropy = np.random.SeedSequence(Seed).entropy  # kept so checkpoints can recreate the worker streams
+        self.rng = np.random.default_rng(self.Entropy)
 
         self.NumMembers = NumMembers  # number of member corss-sections
         self.NumNodes = NumNodes
 
         self.NumCrossSections = NumCrossSections
+        self.Grouped = NumCrossSections != NumMembers
+        self.Discrete = Discrete
+        self.LoadCases = LoadCases
+        if Discrete:
+            AMin, AMax = 0, self.Truss.Catalog.NumSections - 1
         self.AMin, self.AMax = AMin, AMax  # min and max cross-section arrea
         self.changeAMin, self.changeAMax = -0.2 * (AMax - AMin), 0.2 * (AMax - AMin)  # min and max change of cross-section area
         self.MaxIt = MaxItervals  # Number of intervals
         self.ps = PopSize  # size of each interval
 
         self.StressLimit = stressLimit
+        self.Cost = Cost if Cost is not None else CostFunction.CostFunction(stressLimit)
+
+        self.Workers = Workers
+        self.Pool = None
+        if Workers > 0:
+            self.Synchronous = True
 
         self.c1, self.c2 = 2, 2  # multiplying constancts
         self.w = 0.9 - ((0.9 - 0.4) / self.MaxIt) * np.linspace(0, self.MaxIt, self.MaxIt)  # mumultiplying constancts
 
-        # Initilizing all varables
-        self.Area = np.random.uniform((self.AMax - self.AMin) * 0.5, self.AMax, [self.ps, self.NumMembers])
-        self.ChangeInArea = np.random.uniform(self.changeAMin, self.changeAMax, [self.ps, self.NumMembers])
+        self.Iteration = 0  # number of iterations run so far
+        self.NumAnalyses = 0
+        self.StopReason = None
+
+        if Initialize:
+            self.openPool()
+            self.initializeSwarm()
+
+    def initializeSwarm(self):
+        """
+        Places the particles randomly in the search space and evaluates them
+        """
+        self.Area = self.rng.uniform((self.AMax - self.AMin) * 0.5, self.AMax, [self.ps, self.NumCrossSections])
+        self.ChangeInArea = self.rng.uniform(self.changeAMin, self.changeAMax, [self.ps, self.NumCrossSections])
 
         self.cost = np.zeros(self.ps)
 
-        self.stress = np.zeros([self.ps, self.NumMembers])
+        combinations = [len(self.Truss.CombinationNames)] if self.LoadCases else []
+        self.stress = np.zeros([self.ps] + combinations + [self.NumMembers])
         self.weight = np.zeros([self.ps, self.NumMembers])
-        self.disp = np.zeros([self.ps, self.NumNodes, 2])
+        self.disp = np.zeros([self.ps] + combinations + [self.NumNodes, self.Truss.DOF])
 
-        for i in range(self.ps):
-            self.stress[i], self.weight[i], self.disp[i] = self.Truss.Analysis(self.Area[i])
-            self.cost[i] = self.calcCost(self.weight[i][0], self.disp[i], self.stress[i])
+        self.evaluateSwarm()
 
         self.pBestAreas = np.copy(self.Area)
         self.pBestCost = np.copy(self.cost)
 
         self.index = np.argmin(self.pBestCost)
-        self.gBestAreas = self.pBestAreas[self.index]
+        self.gBestAreas = np.copy(self.pBestAreas[self.index])
         self.gBestCost = self.pBestCost[self.index]
 
-        self.BestAreas = np.zeros([self.MaxIt, self.NumMembers])
+        self.BestAreas = np.zeros([self.MaxIt, self.NumCrossSections])
         self.BestCost = np.zeros(self.MaxIt)
 
-    def Evaluate(self):
+    def openPool(self):
+        """
+        Starts the worker processes if the run uses them and they are not running
+        """
+        if self.Workers > 0 and self.Pool is None:
+            self.Pool = ParallelEvaluation.ParallelEvaluator(self.Truss, self.Workers, self.Cost, self.Entropy)
+
+    def Evaluate(self, StagnationIterations=None, RelativeTolerance=0, DiversityTolerance=None, MaxTime=None,
+                 MaxAnalyses=None, Callback=None, CheckpointPath=None, CheckpointEvery=10):
+        """
+        Optimizes the given truss. Runs up to MaxItervals iterations unless one of the stopping criteria is met
+        first, in which case BestCost and BestAreas are cut to the iterations that were run and StopReason says why.
+        Calling it again, or on a run made by Resume, continues from the last iteration that was run. If the truss is
+        an AnalysisCache its persistent tier is committed when the run stops
+
+        :param StagnationIterations: stop when gBest has improved by no more than RelativeTolerance over this many
+            iterations
+        :param RelativeTolerance: relative improvement of gBest that counts as stagnation
+        :param DiversityTolerance: stop when the mean distance of the particles from the swarm centre, relative to
+            the size of the search space, falls below this
+        :param MaxTime: wall-clock budget in seconds
+        :param MaxAnalyses: budget of truss analyses
+        :param Callback: called as Callback(it, self) after every iteration, returning True stops the run
+        :param CheckpointPath: if given the run is saved to this file every CheckpointEvery iterations and when it
+            stops, so it can be continued with Resume
+        :param CheckpointEvery: number of iterations between checkpoints
+        """
+        start = time.perf_counter()
+        self.StopReason = None
+        self.openPool()
+
+        if len(self.BestCost) < self.MaxIt:  # the last run stopped early
+            self.BestCost = np.concatenate((self.BestCost, np.zeros(self.MaxIt - len(self.BestCost))))
+            self.BestAreas = np.concatenate(
+                (self.BestAreas, np.zeros([self.MaxIt - len(self.BestAreas), self.NumCrossSections])))
+
+        try:
+            for it in range(self.Iteration, self.MaxIt):
+                if self.Synchronous:
+                    self.updateSwarm(it)
+                else:
+                    self.updateParticles(it)
+
+                # Saving the best costs and areas for each interval
+                self.BestCost[it] = self.gBestCost
+                self.BestAreas[it] = self.gBestAreas
+                self.Iteration = it + 1
+                self.Profiler.endIteration(it)
+
+                if Callback is not None and Callback(it, self):
+                    self.StopReason = 'callback'
+                elif StagnationIterations is not None and it >= StagnationIterations and (
+                        self.BestCost[it - StagnationIterations] - self.gBestCost
+                        <= RelativeTolerance * np.abs(self.BestCost[it - StagnationIterations])):
+                    self.StopReason = 'stagnation'
+                elif DiversityTolerance is not None and self.diversity() < DiversityTolerance:
+                    self.StopReason = 'diversity'
+                elif MaxTime is not None and time.perf_counter() - start >= MaxTime:
+                    self.StopReason = 'time'
+                elif MaxAnalyses is not None and self.NumAnalyses >= MaxAnalyses:
+                    self.StopReason = 'analyses'
+
+                if CheckpointPath is not None and (self.StopReason is not None or self.Iteration % CheckpointEvery == 0
+                                                   or self.Iteration == self.MaxIt):
+                    with self.Profiler.phase('checkpoint'):
+                        self.Checkpoint(CheckpointPath)
+
+                if self.StopReason is not None:
+                    self.BestCost = self.BestCost[:it + 1]
+                    self.BestAreas = self.BestAreas[:it + 1]
+                    break
+
+        finally:
+            if self.Pool is not None:
+                self.Pool.close()
+                self.Pool = None
+            if isinstance(self.Truss, AnalysisCache.AnalysisCache):
+                self.Truss.commit()
+
+    def Checkpoint(self, path):
+        """
+        Saves the state of the run to a .npz file. It is written to a temporary file first and then moved over the
+        old checkpoint, so a crash while saving leaves the previous checkpoint intact
+
+        :param path: path of the checkpoint file
+        """
+        settings = {'NumMembers': self.NumMembers, 'NumNodes': self.NumNodes,
+                    'NumCrossSections': self.NumCrossSections, 'AMin': self.AMin, 'AMax': self.AMax,
+                    'MaxItervals': self.MaxIt, 'PopSize': self.ps, 'stressLimit': self.StressLimit,
+                    'Synchronous': self.Synchronous, 'Discrete': self.Discrete, 'LoadCases': self.LoadCases,
+                    'Entropy': self.Entropy, 'Workers': self.Workers, 'Iteration': self.Iteration,
+                    'NumAnalyses': self.NumAnalyses, 'StopReason': self.StopReason,
+                    'Cost': {'stressLimit': self.Cost.StressLimit, 'weightExponent': self.Cost.WeightExponent,
+                             'weightFactor': self.Cost.WeightFactor, 'deflectionFactor': self.Cost.DeflectionFactor,
+                             'deflectionAxis': self.Cost.DeflectionAxis},
+                    'rng': self.rng.bit_generator.state}
+
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.savez(f, Settings=json.dumps(settings), Area=self.Area, ChangeInArea=self.ChangeInArea,
+                     cost=self.cost, stress=self.stress, weight=self.weight, disp=self.disp,
+                     pBestAreas=self.pBestAreas, pBestCost=self.pBestCost, gBestAreas=self.gBestAreas,
+                     gBestCost=self.gBestCost, BestAreas=self.BestAreas[:self.Iteration],
+                     BestCost=self.BestCost[:self.Iteration])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    @classmethod
+    def Resume(cls, path, Truss, Cost=None, Workers=None):
+        """
+        Recreates a run from a checkpoint. Calling Evaluate on it continues where the run stopped, drawing the same
+        random numbers the run would have drawn had it not been stopped
+
+        :param path: path of the checkpoint file
+        :param Truss: the truss that was being optimized, startAnalysis must already have been called
+        :param Cost: CostFunction used to score the trusses, defaults to one with the saved parameters
+        :param Workers: number of worker processes, defaults to the number the run used. The run is only repeated
+            exactly with the same number of workers
+        :return: the run
         """
-        Optimizes the given truss
+        with np.load(path) as data:
+            settings = json.loads(str(data['Settings']))
+            if Cost is None:
+                Cost = CostFunction.CostFunction(**settings['Cost'])
+
+            self = cls(settings['NumMembers'], settings['NumNodes'], settings['NumCrossSections'], settings['AMin'],
+                       settings['AMax'], settings['MaxItervals'], settings['PopSize'], settings['stressLimit'], Truss,
+                       Synchronous=settings['Synchronous'], Seed=settings['Entropy'], Cost=Cost,
+                       Workers=settings['Workers'] if Workers is None else Workers,
+                       Discrete=settings['Discrete'], LoadCases=settings['LoadCases'], Initialize=False)
+
+            for name in ('Area', 'ChangeInArea', 'cost', 'stress', 'weight', 'disp', 'pBestAreas', 'pBestCost',
+                         'gBestAreas', 'BestAreas', 'BestCost'):
+                setattr(self, name, np.array(data[name]))
+            self.gBestCost = float(data['gBestCost'])
+
+        self.Iteration = settings['Iteration']
+        self.NumAnalyses = settings['NumAnalyses']
+        self.StopReason = settings['StopReason']
+        self.rng.bit_generator.state = settings['rng']
+        return self
+
+    def diversity(self):
+        """
+        :return: mean distance of the particles from the swarm centre, relative to the size of the search space
+        """
+        distance = np.linalg.norm(self.Area - self.Area.mean(axis=0), axis=1).mean()
+        return distance / ((self.AMax - self.AMin) * np.sqrt(self.NumCrossSections))
 
-        :return:
+    def updateParticles(self, it):
         """
+        Moves and evaluates the particles one at a time, updating gBest as soon as a particle improves on it
 
-        for it in range(self.MaxIt):
-            for i in range(self.ps):
+        :param it: the current iteration
+        """
+        for i in range(self.ps):
 
-                # changing cross-section areas
+            # changing cross-section areas
+            with self.Profiler.phase('move'):
+                r = self.rng.random([2, self.NumCrossSections])
                 self.ChangeInArea[i] = ((self.w[it] * self.ChangeInArea[i])
-                                        + self.c1 * np.random.rand(self.NumMembers) * (self.pBestAreas[i] - self.Area[i])
-                                        + self.c2 * np.random.rand(self.NumMembers) * (self.gBestAreas - self.Area[i]))
+                                        + self.c1 * r[0] * (self.pBestAreas[i] - self.Area[i])
+                                        + self.c2 * r[1] * (self.gBestAreas - self.Area[i]))
                 self.ChangeInArea[i] = self.limitChangeA(self.ChangeInArea[i])
                 self.Area[i] += self.ChangeInArea[i]
                 self.Area[i] = self.limitA(self.Area[i])
 
-                # geting the cost of the truss
-                self.stress[i], self.weight[i], self.disp[i] = self.Truss.Analysis(self.Area[i])
-                self.cost[i] = self.calcCost(self.weight[i][0], self.disp[i], self.stress[i])
+            # geting the cost of the truss
+            self.stress[i], self.weight[i], self.disp[i] = self.analyse(self.Area[i])
+            self.cost[i] = self.calcCost(self.weight[i][0], self.disp[i], self.stress[i])
+            self.NumAnalyses += 1
+
+            # updating best costs
+            if self.cost[i] < self.pBestCost[i]:
+                self.pBestAreas[i] = self.Area[i]
+                self.pBestCost[i] = self.cost[i]
+                if self.pBestCost[i] < self.gBestCost:
+                    self.gBestAreas = np.copy(self.pBestAreas[i])
+                    self.gBestCost = self.pBestCost[i]
+
+    def updateSwarm(self, it):
+        """
+        Moves the whole swarm at once and evaluates it with one batched analysis
 
-                # updating best costs
-                if self.cost[i] < self.pBestCost[i]:
-                    self.pBestAreas[i] = self.Area[i]
-                    self.pBestCost[i] = self.cost[i]
-                    if self.pBestCost[i] < self.gBestCost:
-                        self.gBestAreas = self.pBestAreas[i]
-                        self.gBestCost = self.pBestCost[i]
+        :param it: the current iteration
+        """
+        if self.Pool is not None:
+            self.Area, self.ChangeInArea, self.stress, Mass, self.disp, self.cost = self.Pool.MoveAndEvaluate(
+                it, self.Area, self.ChangeInArea, self.pBestAreas, self.gBestAreas, self.w[it], self.c1, self.c2,
+                (self.changeAMin, self.changeAMax), (self.AMin, self.AMax), self.Grouped, self.Discrete,
+                self.LoadCases)
+            self.weight[:] = Mass[:, np.newaxis]
+            self.NumAnalyses += self.ps
+        else:
+            with self.Profiler.phase('move'):
+                r = self.rng.random([2, self.ps, self.NumCrossSections])
+                self.ChangeInArea = ((self.w[it] * self.ChangeInArea)
+                                     + self.c1 * r[0] * (self.pBestAreas - self.Area)
+                                     + self.c2 * r[1] * (self.gBestAreas - self.Area))
+                self.ChangeInArea = self.limitChangeA(self.ChangeInArea)
+                self.Area = self.limitA(self.Area + self.ChangeInArea)
+
+            self.evaluateSwarm()
+
+        # updating best costs
+        improved = self.cost < self.pBestCost
+        self.pBestAreas[improved] = self.Area[improved]
+        self.pBestCost[improved] = self.cost[improved]
+
+        best = np.argmin(self.pBestCost)
+        if self.pBestCost[best] < self.gBestCost:
+            self.gBestAreas = np.copy(self.pBestAreas[best])
+            self.gBestCost = self.pBestCost[best]
+
+    def evaluateSwarm(self):
+        """
+        Analyses all the particles with one batched analysis and calculates their costs
+        """
+        analysis = self.Pool if self.Pool is not None else self.Truss
+        if self.LoadCases:
+            self.stress, Mass, self.disp = analysis.AnalysisLoadCasesBatch(self.Area, self.Grouped, self.Discrete)
+        else:
+            self.stress, Mass, self.disp = analysis.AnalysisBatch(self.Area, self.Grouped, self.Discrete)
+        self.weight[:] = Mass[:, np.newaxis]
+        self.cost = self.calcCost(Mass, self.disp, self.stress)
+        self.NumAnalyses += self.ps
+
+    def analyse(self, A):
+        """
+        Analyses one truss
 
-            # Saving the best costs and areas for each interval
-            self.BestCost[it] = self.gBestCost
-            self.BestAreas[it] = self.gBestAreas
+        :param A: the design variables of the truss
+        :return: stresses, mass and displacements, for every load combination if LoadCases
+        """
+        if self.LoadCases:
+            return self.Truss.AnalysisLoadCases(A, self.Grouped, self.Discrete)
+        return self.Truss.Analysis(A, self.Grouped, self.Discrete)
 
     def Plot(self):
+        import matplotlib.pyplot as plt
+
         plt.plot(self.BestCost)
-        print("Design Variables A[in2]")
-        print(self.BestAreas[-1][np.newaxis].T)
-        Stress, cost, Disp = self.Truss.Analysis(self.BestAreas[-1])
+        if self.Discrete:
+            index = self.Truss.Catalog.index(self.BestAreas[-1])
+            print("Sections")
+            print([self.Truss.Catalog.Names[i] for i in index])
+            print("Design Variables A[in2]")
+            print(self.Truss.Catalog.Areas[index][np.newaxis].T)
+        else:
+            print("Design Variables A[in2]")
+            print(self.BestAreas[-1][np.newaxis].T)
+        Stress, cost, Disp = self.analyse(self.BestAreas[-1])
         print("stress [ksi]")
-        print(Stress[np.newaxis].T)
+        print(np.atleast_2d(Stress).T)
         print("Displacement [in]")
         print(Disp)
         # plt.ylim([10e-120, 10e20])
@@ -103,12 +363,7 @@ class ParticalSwarmOptimization:
         :param ChangeA: The change in area to be checked
         :return: The limited change in area
         """
-        for i in range(len(ChangeA)):
-            if ChangeA[i] > self.changeAMax:
-                ChangeA[i] = self.changeAMax
-            if ChangeA[i] < self.changeAMin:
-                ChangeA[i] = self.changeAMin
-        return ChangeA
+        return np.clip(ChangeA, self.changeAMin, self.changeAMax, out=ChangeA)
 
     def limitA(self, A):
         """
@@ -117,12 +372,7 @@ class ParticalSwarmOptimization:
         :param A: The cross-section area to be checked
         :return: The limited cross-section area
         """
-        for i in range(len(A)):
-            if A[i] > self.AMax:
-                A[i] = self.AMax
-            if A[i] < self.AMin:
-                A[i] = self.AMin
-        return A
+        return np.clip(A, self.AMin, self.AMax, out=A)
 
     def calcCost(self, weight, deflection, stress):
         """
@@ -133,25 +383,7 @@ class ParticalSwarmOptimization:
         :param stress: stresses in all the members of the truss
         :return: cost of the truss
         """
-
-        # adding cost if a member is exceding the stree limit
-        C_total = 0
-        for cd in range(self.NumMembers):
-            if np.abs(stress[cd]) >  self.StressLimit:
-                C1 = np.abs((stress[cd] -  self.StressLimit) /  self.StressLimit)
-            else:
-                C1 = 0
-            C_total = C_total + C1
-
-        # finding the maximum vertical deflection
-        maxDif = 0
-        for i in range(self.NumNodes):
-            if np.abs(deflection[i, 1]) > maxDif:
-                maxDif = np.abs(deflection[i, 1])
-
-        # calculating cost
-        Cs = weight ** 1.8 * 75 + 0.95 * maxDif * 4000000
-
-        return Cs * (1 + C_total)
-
-
+        with self.Profiler.phase('cost'):
+            if self.LoadCases:
+                return self.Cost.EvaluateEnvelope(weight, deflection, stress)
+            return self.Cost.Evaluate(weight, deflection, stress)
@@ -0,0 +1,171 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import TrussAnalysis
+
+# state of a worker process, set once by initWorker
+workerTruss = None
+workerCost = None
+workerMemory = []
+
+
+def shareArray(array):
+    """
+    Copies an array into a new block of shared memory
+
+    :param array: the array to share
+    :return: the shared memory block and the (name, shape, dtype) needed to attach to it
+    """
+    array = np.ascontiguousarray(array)
+    memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+def attachArray(descriptor):
+    """
+    Attaches to an array shared with shareArray
+
+    :param descriptor: (name, shape, dtype) of the shared array
+    :return: the shared memory block and the array viewing it
+    """
+    name, shape, dtype = descriptor
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def initWorker(descriptors, settings, cost):
+    """
+    Builds the worker's copy of the truss from the shared geometry, once per worker process
+
+    :param descriptors: shared array descriptors of nodes, bars, groups, P, DOFCON, PCases and
+        CombinationFactors
+    :param settings: E, p, Solver, SparseThreshold, SingularTolerance and Catalog of the truss
+    :param cost: the CostFunction used to score the trusses
+    """
+    global workerTruss, workerCost
+
+    arrays = []
+    for descriptor in descriptors:
+        memory, array = attachArray(descriptor)
+        workerMemory.append(memory)
+        arrays.append(array)
+
+    workerTruss = TrussAnalysis.Truss()
+    (workerTruss.E, workerTruss.p, workerTruss.Solver, workerTruss.SparseThreshold, workerTruss.SingularTolerance,
+     workerTruss.Catalog) = settings
+    (workerTruss.nodes, workerTruss.bars, workerTruss.groups, workerTruss.P, workerTruss.DOFCON,
+     workerTruss.PCases, workerTruss.CombinationFactors) = arrays
+    workerTruss.precomputeGeometry()
+    workerCost = cost
+
+
+def analyseChunk(task):
+    A, Grouped, Discrete, LoadCases = task
+    if LoadCases:
+        return workerTruss.AnalysisLoadCasesBatch(A, Grouped, Discrete)
+    return workerTruss.AnalysisBatch(A, Grouped, Discrete)
+
+
+def moveAndEvaluateChunk(task):
+    """
+    Moves one chunk of the swarm with the chunk's own random stream, then analyses it and scores it
+
+    :param task: the chunk's seed and swarm state, and the PSO constants for the iteration
+    :return: new areas, changes in area, stresses, masses, displacements and costs of the chunk
+    """
+    seed, Area, ChangeInArea, pBestAreas, gBestAreas, w, c1, c2, changeLimits, areaLimits, Grouped, Discrete, LoadCases = task
+    rng = np.random.default_rng(seed)
+
+    r = rng.random((2,) + Area.shape)
+    ChangeInArea = w * ChangeInArea + c1 * r[0] * (pBestAreas - Area) + c2 * r[1] * (gBestAreas - Area)
+    ChangeInArea = np.clip(ChangeInArea, *changeLimits)
+    Area = np.clip(Area + ChangeInArea, *areaLimits)
+
+    if LoadCases:
+        S, Mass, U = workerTruss.AnalysisLoadCasesBatch(Area, Grouped, Discrete)
+        return Area, ChangeInArea, S, Mass, U, workerCost.EvaluateEnvelope(Mass, U, S)
+    S, Mass, U = workerTruss.AnalysisBatch(Area, Grouped, Discrete)
+    return Area, ChangeInArea, S, Mass, U, workerCost.Evaluate(Mass, U, S)
+
+
+class ParallelEvaluator:
+    def __init__(self, Truss, Workers, Cost, Seed=None):
+        """
+        Spreads the analyses of a swarm over a pool of worker processes. The truss geometry is copied to shared
+        memory once and every worker builds its own analysis from it
+
+        :param Truss: the truss to analyse, startAnalysis must already have been called
+        :param Workers: number of worker processes
+        :param Cost: CostFunction used by the workers to score the trusses
+        :param Seed: seed of the worker random streams
+        """
+        self.Workers = Workers
+        self.Profiler = Truss.Profiler  # the workers' own phases are not recorded, only the time waiting for them
+        self.Entropy = np.random.SeedSequence(Seed).entropy
+
+        self.memory = []
+        descriptors = []
+        for array in (Truss.nodes, Truss.bars, Truss.groups, Truss.P, Truss.DOFCON, Truss.PCases,
+                      Truss.CombinationFactors):
+            memory, descriptor = shareArray(array)
+            self.memory.append(memory)
+            descriptors.append(descriptor)
+
+        settings = (Truss.E, Truss.p, Truss.Solver, Truss.SparseThreshold, Truss.SingularTolerance, Truss.Catalog)
+        self.pool = mp.Pool(Workers, initializer=initWorker, initargs=(descriptors, settings, Cost))
+
+    def chunks(self, NP):
+        return np.array_split(np.arange(NP), min(self.Workers, NP))
+
+    def AnalysisBatch(self, A, Grouped=False, Discrete=False, LoadCases=False):
+        """
+        Analyses a whole population of cross-section areas across the workers
+
+        :param A: cross-section areas, shape [PopSize, NumMembers], or [PopSize, NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in the truss's section catalog
+        :param LoadCases: if True every load combination is analysed, as in Truss.AnalysisLoadCasesBatch
+        :return: stresses [PopSize, NumMembers], masses [PopSize], displacements [PopSize, NumNodes, DOF]
+        """
+        A = np.atleast_2d(A)
+        tasks = [(A[index], Grouped, Discrete, LoadCases) for index in self.chunks(len(A))]
+        with self.Profiler.phase('parallel'):
+            results = self.pool.map(analyseChunk, tasks)
+        self.Profiler.count('analyses', len(A))
+        return tuple(np.concatenate(part) for part in zip(*results))
+
+    def AnalysisLoadCasesBatch(self, A, Grouped=False, Discrete=False):
+        return self.AnalysisBatch(A, Grouped, Discrete, True)
+
+    def MoveAndEvaluate(self, it, Area, ChangeInArea, pBestAreas, gBestAreas, w, c1, c2, changeLimits, areaLimits,
+                        Grouped=False, Discrete=False, LoadCases=False):
+        """
+        Moves and evaluates the whole swarm across the workers. Chunk j of iteration it always draws from the
+        stream seeded by (Seed, j, it), so a run is reproducible for a given seed and number of workers
+
+        :param it: the current iteration
+        :return: new areas, changes in area, stresses, masses, displacements and costs of the swarm
+        """
+        tasks = []
+        for j, index in enumerate(self.chunks(len(Area))):
+            seed = np.random.SeedSequence(self.Entropy, spawn_key=(j, it))
+            tasks.append((seed, Area[index], ChangeInArea[index], pBestAreas[index], gBestAreas, w, c1, c2,
+                          changeLimits, areaLimits, Grouped, Discrete, LoadCases))
+        with self.Profiler.phase('parallel'):
+            results = self.pool.map(moveAndEvaluateChunk, tasks)
+        self.Profiler.count('analyses', len(Area))
+        return tuple(np.concatenate(part) for part in zip(*results))
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory
+        """
+        self.pool.close()
+        self.pool.join()
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory = []
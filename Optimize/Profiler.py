@@ -0,0 +1,137 @@
+import contextlib
+import json
+import time
+from collections import defaultdict
+
+NullPhase = contextlib.nullcontext()
+
+
+class Timer:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.times[self.name] += time.perf_counter() - self.start
+        self.profiler.calls[self.name] += 1
+        return False
+
+
+class Profiler:
+    def __init__(self, Enabled=True):
+        """
+        Records how long each phase of a run takes and counts events such as analyses, cache hits and singular
+        solves. The records are kept per iteration so they can be exported. When disabled phase returns a shared
+        do-nothing context and count returns at once, so instrumented code runs at almost full speed
+
+        :param Enabled: whether anything is recorded
+        """
+        self.Enabled = Enabled
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all the records
+        """
+        self.times = defaultdict(float)  # phase -> seconds in the current iteration
+        self.calls = defaultdict(int)  # phase -> number of times it ran in the current iteration
+        self.counters = defaultdict(int)  # counter -> count in the current iteration
+        self.History = []  # one record per finished iteration
+        self.iterationStart = time.perf_counter()
+
+    def phase(self, name):
+        """
+        Times a phase, used as `with profiler.phase('solve'):`
+
+        :param name: name of the phase
+        :return: a context manager
+        """
+        if not self.Enabled:
+            return NullPhase
+        return Timer(self, name)
+
+    def count(self, name, n=1):
+        """
+        Adds to a counter
+
+        :param name: name of the counter
+        :param n: amount to add
+        """
+        if self.Enabled:
+            self.counters[name] += n
+
+    def endIteration(self, iteration=None):
+        """
+        Closes the records of the current iteration and starts new ones
+
+        :param iteration: number of the iteration, defaults to the number of iterations recorded so far
+        :return: the record of the iteration, {'iteration', 'time', 'phases', 'calls', 'counters'}
+        """
+        if not self.Enabled:
+            return None
+        now = time.perf_counter()
+        record = {'iteration': len(self.History) if iteration is None else iteration,
+                  'time': now - self.iterationStart,
+                  'phases': dict(self.times), 'calls': dict(self.calls), 'counters': dict(self.counters)}
+        self.History.append(record)
+
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.iterationStart = now
+        return record
+
+    def Totals(self):
+        """
+        :return: {'time', 'phases', 'calls', 'counters'} summed over the finished iterations and the current one
+        """
+        totals = {'time': time.perf_counter() - self.iterationStart, 'phases': defaultdict(float),
+                  'calls': defaultdict(int), 'counters': defaultdict(int)}
+        for record in self.History + [{'phases': self.times, 'calls': self.calls, 'counters': self.counters}]:
+            totals['time'] += record.get('time', 0)
+            for key in ('phases', 'calls', 'counters'):
+                for name, value in record[key].items():
+                    totals[key][name] += value
+        return {key: dict(value) if isinstance(value, defaultdict) else value for key, value in totals.items()}
+
+    def Report(self):
+        """
+        :return: a table of the time spent in each phase and the counters
+        """
+        totals = self.Totals()
+        lines = ["%-20s %10s %8s %10s" % ("phase", "seconds", "share", "calls")]
+        for name, seconds in sorted(totals['phases'].items(), key=lambda item: -item[1]):
+            share = seconds / totals['time'] if totals['time'] > 0 else 0
+            lines.append("%-20s %10.4f %7.1f%% %10d" % (name, seconds, 100 * share, totals['calls'][name]))
+        lines.append("%-20s %10.4f" % ("total", totals['time']))
+        for name, value in sorted(totals['counters'].items()):
+            lines.append("%-20s %10d" % (name, value))
+        return "\n".join(lines)
+
+    def export(self, path):
+        """
+        Saves the per iteration records, as CSV with one column per phase and counter if path ends in .csv and as
+        JSON otherwise
+
+        :param path: path of the file
+        """
+        if not path.endswith('.csv'):
+            with open(path, 'w') as f:
+                json.dump({'iterations': self.History, 'totals': self.Totals()}, f, indent=2)
+            return
+
+        phases = sorted({name for record in self.History for name in record['phases']})
+        counters = sorted({name for record in self.History for name in record['counters']})
+        with open(path, 'w') as f:
+            f.write(",".join(['iteration', 'time'] + [name + ' [s]' for name in phases] + counters) + "\n")
+            for record in self.History:
+                row = [record['iteration'], record['time']]
+                row += [record['phases'].get(name, 0) for name in phases]
+                row += [record['counters'].get(name, 0) for name in counters]
+                f.write(",".join(str(value) for value in row) + "\n")
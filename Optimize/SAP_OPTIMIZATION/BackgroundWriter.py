@@ -0,0 +1,59 @@
+import atexit
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+class BackgroundWriter:
+    def __init__(self):
+        """
+        Writes arrays to .npz files on a thread of its own, so the analyses do not wait for the disk. Files still
+        queued when the program ends are written before it exits
+        """
+        self.queue = queue.Queue()
+        self.error = None  # the last OSError of a write, the writer carries on with the next file
+        self.thread = threading.Thread(target=self.run, name='BackgroundWriter', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def write(self, path, **arrays):
+        """
+        Queues a file to be written
+
+        :param path: path of the .npz file
+        :param arrays: the arrays to write, copied so they can be changed once this returns
+        """
+        self.queue.put((path, {name: np.array(value) for name, value in arrays.items()}))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                path, arrays = item
+                temporary = path + '.tmp'
+                try:
+                    with open(temporary, 'wb') as f:
+                        np.savez(f, **arrays)
+                    os.replace(temporary, path)
+                except OSError as error:
+                    self.error = error
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """
+        Waits until every queued file is written
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Writes the queued files and stops the thread
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
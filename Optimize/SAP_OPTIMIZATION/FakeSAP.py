@@ -0,0 +1,84 @@
+class FakeSapObject:
+    def __init__(self):
+        """
+        Stands in for the SAP2000 object SAPInterface.openSAP returns, so the SAP pipeline of Truss can run without
+        SAP2000 or Windows. Every call made through it is recorded in self.calls as (name, arguments), and
+        JointDispl answers with made up displacements, see displacement
+        """
+        self.calls = []
+        self.SapModel = FakeCOM(self, 'SapModel')
+        self.points = []  # names of the points of the current model
+        self.selected = []  # load cases selected for output
+
+    def count(self, name):
+        """
+        :param name: full name of a method, such as 'SapModel.FrameObj.SetSection'
+        :return: how many times it was called
+        """
+        return sum(1 for call in self.calls if call[0] == name)
+
+    def arguments(self, name):
+        """
+        :param name: full name of a method
+        :return: the arguments of each call of it
+        """
+        return [call[1] for call in self.calls if call[0] == name]
+
+    def displacement(self, case, point):
+        """
+        :param case: position of the load case among the selected ones
+        :param point: position of the point in the model
+        :return: the made up vertical displacement JointDispl returns
+        """
+        return -(case + 1) - 0.01 * point
+
+    def respond(self, name, args):
+        self.calls.append((name, args))
+        if name == 'SapModel.InitializeNewModel':
+            self.points = []
+        elif name == 'SapModel.PointObj.AddCartesian':
+            self.points.append(args[4])
+            return [args[4], 0]
+        elif name == 'SapModel.FrameObj.AddByPoint':
+            return [args[4], 0]
+        elif name == 'SapModel.Results.Setup.DeselectAllCasesAndCombosForOutput':
+            self.selected = []
+        elif name == 'SapModel.Results.Setup.SetCaseSelectedForOutput':
+            self.selected.append(args[0])
+        elif name == 'SapModel.Results.JointDispl':
+            return self.jointDispl(args[0], args[1])
+        return 0
+
+    def jointDispl(self, Name, ItemTypeElm):
+        """
+        :param Name: name of a point, or of a group if ItemTypeElm is 2
+        :param ItemTypeElm: 0 for a point object, 2 for the points of a group
+        :return: the results of the selected load cases in the order SAP2000 returns them
+        """
+        GroupElm = 2
+        points = list(range(len(self.points))) if ItemTypeElm == GroupElm else [self.points.index(Name)]
+        rows = [(c, j) for c in range(len(self.selected)) for j in points]
+        Obj = [self.points[j] for c, j in rows]
+        LoadCase = [self.selected[c] for c, j in rows]
+        U3 = [self.displacement(c, j) for c, j in rows]
+        zeros = [0.0] * len(rows)
+        return [len(rows), Obj, list(Obj), LoadCase, [''] * len(rows), zeros, zeros, zeros, U3, zeros, zeros, zeros,
+                0]
+
+
+class FakeCOM:
+    def __init__(self, sap, name):
+        """
+        One level of the fake SAP object, such as SapModel.FrameObj
+
+        :param sap: the FakeSapObject the calls are recorded in
+        :param name: full name of this level
+        """
+        self.sap = sap
+        self.name = name
+
+    def __getattr__(self, name):
+        return FakeCOM(self.sap, self.name + '.' + name)
+
+    def __call__(self, *args):
+        return self.sap.respond(self.name, args)
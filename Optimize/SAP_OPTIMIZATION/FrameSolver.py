@@ -0,0 +1,192 @@
+import numpy as np
+
+# material and cross-sections of the SAP model, see SAPInterface.createSAPFile
+E = 10000
+Poisson = 0.2
+WeightPerVolume = 0.2836  # SAP2000's default weight of steel in lb and in, added to every load pattern
+Sections = {'R1': (10, 5)}  # name: (depth, width) of each rectangular section
+
+# [x, y, rotation] fixed by each support type of Truss.addSuports (1 = fixed, 0 = free)
+Restraints = np.array([[0, 0, 0], [1, 1, 0], [0, 1, 0], [0, 1, 0]])
+
+# 3 point Gauss-Legendre rule, exact for the cubic shape functions times a uniform load
+GaussPoints, GaussWeights = np.polynomial.legendre.leggauss(3)
+
+
+class FrameSolver:
+    def __init__(self, nodes, members, supports, E=E, Poisson=Poisson, WeightPerVolume=WeightPerVolume,
+                 Sections=Sections, ShearDeformation=True):
+        """
+        Linear 2-D frame analysis of the bridge in the same way SAP2000 analyses the model Truss builds: rigid
+        joints, shear deformations, in-plane bending about the section's strong axis (weak axis for vertical
+        members) and the self weight of the members in every load case. Everything that only depends on the
+        geometry is computed here once
+
+        :param nodes: [x, y] of each node
+        :param members: [node 1, node 2] of each member
+        :param supports: [node, support type] of each node, see Restraints
+        :param E: elastic modulus
+        :param Poisson: Poisson's ratio, gives the shear modulus
+        :param WeightPerVolume: weight of the members per volume, 0 for no self weight
+        :param Sections: {name: (depth, width)} of the rectangular cross-sections
+        :param ShearDeformation: if False the members are Euler-Bernoulli beams
+        """
+        self.nodes = np.asarray(nodes, dtype=float)
+        self.members = np.asarray(members, dtype=int)
+        self.E = E
+        self.G = E / (2 * (1 + Poisson))
+        self.WeightPerVolume = WeightPerVolume
+        self.Sections = Sections
+        self.ShearDeformation = ShearDeformation
+
+        NN = len(self.nodes)
+        self.NDOF = 3 * NN
+
+        d = self.nodes[self.members[:, 1]] - self.nodes[self.members[:, 0]]
+        self.L = np.sqrt((d ** 2).sum(axis=1))
+        self.c, self.s = d[:, 0] / self.L, d[:, 1] / self.L
+        self.vertical = np.abs(self.c) < 1e-3  # SAP2000 turns the local axes of vertical members
+
+        # local to global rotation of each member, [NumMembers, 6, 6]
+        self.T = np.zeros([len(self.members), 6, 6])
+        for k in (0, 3):
+            self.T[:, k, k] = self.T[:, k + 1, k + 1] = self.c
+            self.T[:, k, k + 1] = self.s
+            self.T[:, k + 1, k] = -self.s
+            self.T[:, k + 2, k + 2] = 1
+
+        self.memberDOF = (3 * self.members[:, :, np.newaxis] + np.arange(3)).reshape(-1, 6)
+        self.scatterIndex = (self.memberDOF[:, :, np.newaxis] * self.NDOF + self.memberDOF[:, np.newaxis, :]).ravel()
+
+        supports = np.asarray(supports, dtype=int).reshape(-1, 2)
+        fixed = np.zeros([NN, 3], dtype=int)
+        fixed[supports[:, 0]] = Restraints[supports[:, 1]]
+        self.freeDOF = np.nonzero(fixed.ravel() == 0)[0]
+
+    def memberProperties(self, crossSections):
+        """
+        :param crossSections: name of the cross-section of each member
+        :return: area, in-plane moment of inertia and shear deformation parameter (12 E I / G As L^2) of each
+            member
+        """
+        depth, width = np.array([self.Sections[name] for name in crossSections], dtype=float).T
+        A = depth * width
+        I = np.where(self.vertical, depth * width ** 3, width * depth ** 3) / 12
+        if self.ShearDeformation:
+            phi = 12 * self.E * I / (self.G * 5 / 6 * A * self.L ** 2)
+        else:
+            phi = np.zeros(len(A))
+        return A, I, phi
+
+    def stiffness(self, A, I, phi):
+        """
+        :return: the global stiffness matrix [NDOF, NDOF]
+        """
+        L = self.L
+        EA = self.E * A / L
+        b = self.E * I / ((1 + phi) * L ** 3)
+
+        k = np.zeros([len(L), 6, 6])
+        k[:, 0, 0] = k[:, 3, 3] = EA
+        k[:, 0, 3] = k[:, 3, 0] = -EA
+        k[:, 1, 1] = k[:, 4, 4] = 12 * b
+        k[:, 1, 4] = k[:, 4, 1] = -12 * b
+        k[:, 1, 2] = k[:, 2, 1] = k[:, 1, 5] = k[:, 5, 1] = 6 * L * b
+        k[:, 2, 4] = k[:, 4, 2] = k[:, 4, 5] = k[:, 5, 4] = -6 * L * b
+        k[:, 2, 2] = k[:, 5, 5] = (4 + phi) * L ** 2 * b
+        k[:, 2, 5] = k[:, 5, 2] = (2 - phi) * L ** 2 * b
+
+        kGlobal = np.swapaxes(self.T, 1, 2) @ k @ self.T
+        return np.bincount(self.scatterIndex, kGlobal.ravel(), self.NDOF ** 2).reshape(self.NDOF, self.NDOF)
+
+    def lineLoads(self, members, start, end, q, phi, case, NumCases):
+        """
+        Equivalent nodal loads of uniform loads over parts of members, integrated against the exact shape functions
+        of the members so the nodal displacements are exact
+
+        :param members: member each load is on
+        :param start: distance along the member from its first node at which each load starts
+        :param end: distance along the member from its first node at which each load ends
+        :param q: [qx, qy] global force per length of each load
+        :param phi: shear deformation parameter of every member
+        :param case: load case of each load
+        :param NumCases: number of load cases
+        :return: nodal loads [NumCases, NDOF]
+        """
+        L, phi = self.L[members], phi[members]
+        c, s = self.c[members], self.s[members]
+        qAxial = q[:, 0] * c + q[:, 1] * s
+        qTransverse = -q[:, 0] * s + q[:, 1] * c
+
+        half = (end - start) / 2
+        xi = ((start + end)[:, np.newaxis] / 2 + half[:, np.newaxis] * GaussPoints) / L[:, np.newaxis]
+        w = half[:, np.newaxis] * GaussWeights
+        p = phi[:, np.newaxis]
+        Lm = L[:, np.newaxis]
+        N = np.stack((1 - xi,
+                      (2 * xi ** 3 - 3 * xi ** 2 - p * xi + 1 + p) / (1 + p),
+                      Lm * (xi ** 3 - (2 + p / 2) * xi ** 2 + (1 + p / 2) * xi) / (1 + p),
+                      xi,
+                      (-2 * xi ** 3 + 3 * xi ** 2 + p * xi) / (1 + p),
+                      Lm * (xi ** 3 - (1 - p / 2) * xi ** 2 - p / 2 * xi) / (1 + p)), axis=1)
+        fLocal = (N * w[:, np.newaxis, :]).sum(axis=2)
+        fLocal *= np.where(np.isin(np.arange(6), (0, 3)), qAxial[:, np.newaxis], qTransverse[:, np.newaxis])
+
+        fGlobal = (np.swapaxes(self.T[members], 1, 2) @ fLocal[:, :, np.newaxis])[:, :, 0]
+        index = (case[:, np.newaxis] * self.NDOF + self.memberDOF[members]).ravel()
+        return np.bincount(index, fGlobal.ravel(), NumCases * self.NDOF).reshape(NumCases, self.NDOF)
+
+    def stringerLoads(self, StringerElevation, BetweenDis):
+        """
+        Finds the parts of the stringer a distributed load lies on, like Truss.AddStringerLoads
+
+        :param StringerElevation: height of the top of the stringer
+        :param BetweenDis: the range in x the load is applied over
+        :return: members, and the distances along them from their first node the load starts and ends at
+        """
+        x1, x2 = self.nodes[self.members[:, 0], 0], self.nodes[self.members[:, 1], 0]
+        y1, y2 = self.nodes[self.members[:, 0], 1], self.nodes[self.members[:, 1], 1]
+        low, high = min(BetweenDis), max(BetweenDis)
+        first = np.maximum(np.minimum(x1, x2), low)
+        last = np.minimum(np.maximum(x1, x2), high)
+
+        members = np.nonzero((y1 == StringerElevation) & (y2 == StringerElevation) & (first < last))[0]
+        x1, first, last = x1[members], first[members], last[members]
+        forward = x2[members] >= x1
+        start = np.where(forward, first - x1, x1 - last)
+        end = np.where(forward, last - x1, x1 - first)
+        return members, start, end
+
+    def weight(self, crossSections):
+        """
+        :param crossSections: name of the cross-section of each member
+        :return: the weight of the members
+        """
+        A = self.memberProperties(crossSections)[0]
+        return self.WeightPerVolume * (A * self.L).sum()
+
+    def solve(self, crossSections, Loads, NumCases):
+        """
+        Analyses every load case at once
+
+        :param crossSections: name of the cross-section of each member
+        :param Loads: (members, start, end, q, case) of the distributed loads, see lineLoads
+        :param NumCases: number of load cases
+        :return: [x, y, rotation] displacements of every node, [NumCases, NumNodes, 3]
+        """
+        A, I, phi = self.memberProperties(crossSections)
+        K = self.stiffness(A, I, phi)
+
+        members, start, end, q, case = Loads
+        F = self.lineLoads(members, start, end, q, phi, case, NumCases)
+        if self.WeightPerVolume:
+            selfWeight = np.column_stack((np.zeros(len(A)), -self.WeightPerVolume * A))
+            everyMember = np.tile(np.arange(len(A)), NumCases)
+            F += self.lineLoads(everyMember, np.zeros(len(everyMember)), self.L[everyMember],
+                                np.tile(selfWeight, (NumCases, 1)), phi, np.repeat(np.arange(NumCases), len(A)),
+                                NumCases)
+
+        free = self.freeDOF
+        U = np.zeros([NumCases, self.NDOF])
+        U[:, free] = np.linalg.solve(K[np.ix_(free, free)], F[:, free].T).T
+        return U.reshape(NumCases, -1, 3)
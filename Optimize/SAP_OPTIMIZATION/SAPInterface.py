@@ -1,4 +1,3 @@
-import comtypes.client
 #from comtypes.gen import SAP2000v1
 
 def openSAP():
@@ -6,6 +5,8 @@ def openSAP():
     Opens SAP2000
     :return: The open program sap object
     """
+    import comtypes.client
+
     helper = comtypes.client.CreateObject("SAP2000v1.Helper")
     helper = helper.QueryInterface(comtypes.gen.SAP2000v1.cHelper)
     sap_object = helper.GetObject("CSI.SAP2000.API.SapObject")
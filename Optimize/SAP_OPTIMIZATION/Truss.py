@@ -1,11 +1,67 @@
-import pandas as pd
+"""
+Optimizes the bridge truss in SAP2000 or with FrameSolver. The module is part of the Optimize package, so run its
+test as `python -m Optimize.SAP_OPTIMIZATION.Truss` from the folder holding the package, `python Truss.py` can not
+resolve its imports
+"""
+import contextlib
+import os
 import time
 
-import GeneralFunctions
-import SAPInterface
+import numpy as np
+
+from .. import ModelFile
+from . import BackgroundWriter
+from . import FrameSolver
+from . import GeneralFunctions
+from . import SAPInterface
+
+Directory = os.path.dirname(os.path.abspath(__file__))
+
+# stringer loads (lbs/in) and the ranges of the main span loading of each load case
+PreLoad = 2.7778
+MainSpanLoad = 44.4445
+CantileverLoad = 25
+BetweenMainSpan = [[36, 70], [54, 90], [66, 102], [78, 114], [90, 126], [102, 138], [108, 144], [114, 150],
+                   [120, 156], [132, 168], [144, 180]]
 
 class Truss:
-    def __init__(self, bridgelength, StringerElevation, CantileverPoint):
+    def __init__(self, bridgelength, StringerElevation, CantileverPoint, Profiler=None, Solver='SAP', Persistent=False,
+                 SapObject=None, Save='never', SaveEvery=1, SaveDirectory='Saves', Verbose=False):
+        """
+        :param bridgelength: the total lenght of the bridge
+        :param StringerElevation: the height of the top of the stringer
+        :param CantileverPoint: the node at witch the displacement for the cantilever is mesured
+        :param Profiler: Optimize.Profiler.Profiler that times the phases of each analysis, None for no
+            timing
+        :param Solver: 'SAP' to analyse the truss in SAP2000 or 'frame' to analyse it in process with
+            FrameSolver, which needs neither SAP2000 nor Windows
+        :param Persistent: if True the SAP model is built once and later analyses only change the sections of the
+            cross-section groups before running it again
+        :param SapObject: the SAP object to build the models in, defaults to the one SAPInterface.openSAP returns
+        :param Save: which analyses are saved: 'never', 'best' for the ones that improve on the best cost so far or
+            'every' for every analysis of every SaveEvery-th iteration
+        :param SaveEvery: the iterations saved when Save is 'every'
+        :param SaveDirectory: folder the saves are written to
+        :param Verbose: if True the vertical displacements of every SAP analysis are printed
+        """
+        self.Profiler = Profiler
+        self.Solver = Solver
+        self.Persistent = Persistent
+        self.Verbose = Verbose
+        self.SapModel = None  # the persistent model, once built
+        self.groupSections = {}  # section assigned to each cross-section group of the persistent model
+
+        if Save not in ('never', 'best', 'every'):
+            raise ValueError("Save must be 'never', 'best' or 'every', not %r" % (Save,))
+        self.Save = Save
+        self.SaveEvery = SaveEvery
+        self.SaveDirectory = os.path.abspath(SaveDirectory)  # SAP2000 needs a full path
+        self.BestCost = np.inf
+        self.Writer = None
+        if Save != 'never':
+            os.makedirs(SaveDirectory, exist_ok=True)
+            self.Writer = BackgroundWriter.BackgroundWriter()
+
         self.nodes = []  # [x, y]
         self.supports = []  # [node, support] Support: 1 = pin, 2 = roller
 
@@ -16,7 +72,9 @@ class Truss:
         self.nodeNames = []
         self.memberNames = []
 
-        self.Sap_Object = SAPInterface.openSAP()
+        self.Sap_Object = None
+        if Solver == 'SAP':
+            self.Sap_Object = SAPInterface.openSAP() if SapObject is None else SapObject
         self.readIn()
 
         self.BridgeLength = bridgelength
@@ -34,36 +92,27 @@ class Truss:
 
         self.CantileverPoint = CantileverPoint
 
-    def readIn(self):
-        """
-        reads in the data from the Excel files
-        """
-
-        NodsXlsx = pd.read_excel('Nodes.xlsx')
+        if Solver == 'frame':
+            self.Frame = FrameSolver.FrameSolver(self.nodes, self.members, self.supports)
+            self.FrameLoads = self.frameLoads()
 
-        x = list(NodsXlsx['X'])
-        y = list(NodsXlsx['Y'])
-        Suport = list(NodsXlsx['Support'])
-        Number = list(NodsXlsx['Number'])
-
-        listConvert = [None] * (max(Number) + 1)
-
-        for i in range(len(Number)):
-            listConvert[Number[i]] = i
+    def readIn(self, directory=Directory):
+        """
+        reads in the data from the Excel files, building the arrays straight from the columns. The sheets are
+        cached in a binary model file in the folder, see ModelFile.readSheets
 
-        for i in range(len(x)):
-            self.nodes.append([x[i], y[i]])
-            self.supports.append([i, Suport[i]])
+        :param directory: folder of Nodes.xlsx and Members.xlsx, defaults to the folder of this file
+        """
+        columns = ModelFile.readSheets(directory)
+        Nodes, Members = columns['Nodes'], columns['Members']
 
-        MembersXlsx = pd.read_excel('Members.xlsx')
+        listConvert = ModelFile.nodeIndex(Nodes['Number'])
 
-        Node1 = list(MembersXlsx['Node1'])
-        Node2 = list(MembersXlsx['Node2'])
-        CorssSectionGroup = list(MembersXlsx['Cross-Section Group'])
+        self.nodes = np.column_stack((Nodes['X'], Nodes['Y'])).astype(float)
+        self.supports = np.column_stack((np.arange(len(self.nodes)), Nodes['Support'])).astype(int)
 
-        for i in range(len(Node1)):
-            self.members.append([listConvert[Node1[i]], listConvert[Node2[i]]])
-            self.CSGroup.append(CorssSectionGroup[i])
+        self.members = listConvert[np.column_stack((Members['Node1'], Members['Node2']))]
+        self.CSGroup = np.asarray(Members['Cross-Section Group'], dtype=int)
 
     def anaylize(self, CSGcrossSections, Iteration, Population):
         """
@@ -77,45 +126,195 @@ class Truss:
 
         self.CSGcrossSection = CSGcrossSections
 
-        # tS = time.time()
-        SapModel = SAPInterface.createSAPFile(self.Sap_Object)
-        # tE = time.time()
-        # print('Time to create file: ' + str(tE - tS))
-
-        # tS = time.time()
-        self.addToSAPFile(SapModel)
-        # tE = time.time()
-        # print('Time to add geomitry: ' + str(tE - tS))
+        if self.Solver == 'frame':
+            return self.anaylizeFrame(Iteration, Population)
 
-        # tS = time.time()
-        self.addLoads(SapModel, self.BridgeLength, self.StringerElevation)
-        # tE = time.time()
-        # print('Time to add loads: ' + str(tE - tS))
+        if self.Persistent and self.SapModel is not None:
+            SapModel = self.SapModel
+            with self.phase('sections'):
+                SapModel.SetModelIsLocked(False)
+                self.setGroupSections(SapModel)
+        else:
+            SapModel = self.buildSAPModel()
 
-        # tS = time.time()
-        self.addSuports(SapModel)
-        # tE = time.time()
-        # print('Time to add suports: ' + str(tE - tS))
-
-        # tS = time.time()
-        self.save(SapModel, Iteration, Population)
-        # tE = time.time()
-        # print('Time to save: ' + str(tE - tS))
-
-        # tS = time.time()
         [mainDisplacementMax, cantileverDisplacementMax, massOfTruss] = self.solve(SapModel, self.CantileverPoint,
                                                                                    Iteration,
                                                                                    Population)
-        # tE = time.time()
-        # print('Time to solve and get data: ' + str(tE - tS))
 
-        # tS = time.time()
-        cost = self.calcCost(mainDisplacementMax, cantileverDisplacementMax, massOfTruss)
-        # tE = time.time()
-        # print('Time to calc cost: ' + str(tE - tS))
+        with self.phase('cost'):
+            cost = self.calcCost(mainDisplacementMax, cantileverDisplacementMax, massOfTruss)
+
+        if self.shouldSave(Iteration, cost):
+            # the SAP file is saved through COM so it stays on this thread, the results go to the writer thread
+            with self.phase('save'):
+                self.save(SapModel, Iteration, Population)
+                self.saveRecord(Iteration, Population, cost, mainDisplacementMax=mainDisplacementMax,
+                                cantileverDisplacementMax=cantileverDisplacementMax)
+
+        if self.Profiler is not None:
+            self.Profiler.count('analyses')
+        return cost
+
+    def anaylizeFrame(self, Iteration, Population):
+        """
+        Solves the truss with FrameSolver for the cross-sections in self.CSGcrossSection and returns its cost
 
+        :param Iteration: the iteration is curnently being run
+        :param Population: the index in the population being run
+        :return: cost
+        """
+        crossSections = [self.CSGcrossSection[group] for group in self.CSGroup]
+        NumCases = len(self.preLoadNames)
+
+        with self.phase('solve'):
+            U = self.Frame.solve(crossSections, self.FrameLoads, 3 * NumCases)
+
+        with self.phase('results'):
+            vertical = U[:, :, 1]
+            [mainDisplacementMax, cantileverDisplacementMax] = self.displacementMaxima(
+                vertical[:NumCases], vertical[NumCases:2 * NumCases], vertical[2 * NumCases:], self.CantileverPoint)
+            massOfTruss = self.Frame.weight(crossSections)
+            self.saveResults(Iteration, Population, mainDisplacementMax, cantileverDisplacementMax, massOfTruss)
+
+        with self.phase('cost'):
+            cost = self.calcCost(mainDisplacementMax, cantileverDisplacementMax, massOfTruss)
+
+        if self.shouldSave(Iteration, cost):
+            with self.phase('save'):
+                self.saveRecord(Iteration, Population, cost, displacements=U, mass=massOfTruss,
+                                mainDisplacementMax=mainDisplacementMax,
+                                cantileverDisplacementMax=cantileverDisplacementMax)
+
+        if self.Profiler is not None:
+            self.Profiler.count('analyses')
         return cost
 
+    def shouldSave(self, Iteration, cost):
+        """
+        :param Iteration: the iteration is curnently being run
+        :param cost: cost of the analysis
+        :return: whether the analysis is saved under the save policy
+        """
+        if self.Save == 'best':
+            improved = cost < self.BestCost
+            if improved:
+                self.BestCost = cost
+            return improved
+        return self.Save == 'every' and Iteration % self.SaveEvery == 0
+
+    def saveRecord(self, Iteration, Population, cost, **results):
+        """
+        Queues the cross-sections and results of an analysis to be written to Save_<iteration>_<population>.npz by
+        the writer thread
+
+        :param Iteration: the iteration is curnently being run
+        :param Population: the index in the population being run
+        :param cost: cost of the analysis
+        :param results: the results to save
+        """
+        path = os.path.join(self.SaveDirectory, 'Save_' + str(Iteration) + "_" + str(Population) + '.npz')
+        self.Writer.write(path, crossSections=np.array(self.CSGcrossSection, dtype=str), cost=cost, **results)
+
+    def close(self):
+        """
+        Waits for the saves still being written
+        """
+        if self.Writer is not None:
+            self.Writer.close()
+
+    def loadCases(self):
+        """
+        :return: [range, magnitude] of the stringer loads of each preload, main span and cantilever load case, in the
+            order of preLoadNames, MainSpanNames and CantileverNames
+        """
+        BetweenCatilever = [self.BridgeLength - 36, self.BridgeLength]
+        preLoads = [[[span, PreLoad], [BetweenCatilever, PreLoad]] for span in BetweenMainSpan]
+        mainSpanLoads = [[[span, MainSpanLoad]] for span in BetweenMainSpan]
+        cantileverLoads = [[[span, MainSpanLoad], [BetweenCatilever, CantileverLoad]] for span in BetweenMainSpan]
+        return preLoads + mainSpanLoads + cantileverLoads
+
+    def frameLoads(self):
+        """
+        Finds the members each stringer load of the load cases lies on. This only depends on the geometry so it is
+        done once
+
+        :return: the loads as FrameSolver.solve takes them
+        """
+        parts = []
+        for case, loads in enumerate(self.loadCases()):
+            for BetweenDis, Magnitude in loads:
+                members, start, end = self.Frame.stringerLoads(self.StringerElevation, BetweenDis)
+                parts.append((members, start, end, np.tile([0, -Magnitude], (len(members), 1)),
+                              np.full(len(members), case)))
+        return tuple(np.concatenate(part) for part in zip(*parts))
+
+    def buildSAPModel(self):
+        """
+        Builds a new SAP model of the truss with the cross-sections in self.CSGcrossSection
+
+        :return: the SAP model
+        """
+        with self.phase('create file'):
+            SapModel = SAPInterface.createSAPFile(self.Sap_Object)
+
+        with self.phase('geometry'):
+            self.addToSAPFile(SapModel)
+            if self.Persistent:
+                self.addGroups(SapModel)
+
+        with self.phase('loads'):
+            self.addLoads(SapModel, self.BridgeLength, self.StringerElevation)
+
+        with self.phase('supports'):
+            self.addSuports(SapModel)
+
+        if self.Persistent:
+            self.SapModel = SapModel
+        return SapModel
+
+    def addGroups(self, SapModel):
+        """
+        Puts the members of each cross-section group in a SAP group, so the section of a whole cross-section group
+        is changed with one call
+
+        :param SapModel: the SAP model
+        """
+        for group in np.unique(self.CSGroup):
+            ret = SapModel.GroupDef.SetGroup(self.groupName(group))
+        for i in range(len(self.members)):
+            ret = SapModel.FrameObj.SetGroupAssign(self.memberNames[i], self.groupName(self.CSGroup[i]))
+        self.groupSections = {group: self.CSGcrossSection[group] for group in np.unique(self.CSGroup)}
+
+    def setGroupSections(self, SapModel):
+        """
+        Assigns the sections in self.CSGcrossSection to the cross-section groups whose section changed
+
+        :param SapModel: the SAP model
+        """
+        GROUP = 1
+        for group, section in self.groupSections.items():
+            if self.CSGcrossSection[group] != section:
+                ret = SapModel.FrameObj.SetSection(self.groupName(group), self.CSGcrossSection[group], GROUP)
+                self.groupSections[group] = self.CSGcrossSection[group]
+
+    def groupName(self, group):
+        """
+        :param group: cross-section group
+        :return: name of the SAP group holding the members of the cross-section group
+        """
+        return 'CSG' + str(group)
+
+    def phase(self, name):
+        """
+        Times a phase of the analysis if the truss has a profiler
+
+        :param name: name of the phase
+        :return: a context manager
+        """
+        if self.Profiler is None:
+            return contextlib.nullcontext()
+        return self.Profiler.phase(name)
+
     def addToSAPFile(self, SapModel):
         """
         Adds the nodes and members to the sap file
@@ -123,6 +322,8 @@ class Truss:
         :param SapModel: the SAP model
         """
 
+        self.nodeNames = []
+        self.memberNames = []
         for i in range(len(self.nodes)):
             Name = ""
             [a, ret] = SapModel.PointObj.AddCartesian(0, self.nodes[i][0], self.nodes[i][1], Name, str(i), 'GLOBAL',
@@ -147,8 +348,6 @@ class Truss:
         :param StringerElevation: the height of the top of the stringer
         """
 
-        BetweenMainSpan = [[36, 70], [54, 90], [66, 102], [78, 114], [90, 126], [102, 138], [108, 144], [114, 150],
-                           [120, 156], [132, 168], [144, 180]]
         BetweenCatilever = [BridgeLength - 36, BridgeLength]
 
         self.addPreLoad(SapModel, BetweenMainSpan, BetweenCatilever, StringerElevation)
@@ -166,13 +365,12 @@ class Truss:
         """
 
         LTYPE_OTHER = 8
-        MagPreLoad = 2.7778  # lbs/in
 
         for i in range(len(self.preLoadNames)):
             ret = SapModel.LoadPatterns.Add(self.preLoadNames[i], LTYPE_OTHER, 1, True)
             self.AddStringerLoads(SapModel, self.preLoadNames[i], StringerElevation, BetweenMainSpan[i],
-                                  MagPreLoad, 10)
-            self.AddStringerLoads(SapModel, self.preLoadNames[i], StringerElevation, BetweenCantilever, MagPreLoad,
+                                  PreLoad, 10)
+            self.AddStringerLoads(SapModel, self.preLoadNames[i], StringerElevation, BetweenCantilever, PreLoad,
                                   10)
 
     def addLoadsMainSpan(self, SapModel, BetweenMainSpan, StringerElevation):
@@ -185,7 +383,6 @@ class Truss:
         """
 
         LTYPE_OTHER = 8
-        MainSpanLoad = 44.4445  # lbs/in
 
         for i in range(len(self.MainSpanNames)):
             ret = SapModel.LoadPatterns.Add(self.MainSpanNames[i], LTYPE_OTHER, 1, True)
@@ -203,8 +400,6 @@ class Truss:
         """
 
         LTYPE_OTHER = 8
-        MainSpanLoad = 44.4445  # lbs/in
-        CantileverLoad = 25  # lbs/in
 
         for i in range(len(self.CantileverNames)):
             ret = SapModel.LoadPatterns.Add(self.CantileverNames[i], LTYPE_OTHER, 1, True)
@@ -254,15 +449,14 @@ class Truss:
 
     def save(self, SapModel, Iteration, Population):
         """
-        Saves the sap file
+        Saves the sap file to the save folder
 
         :param SapModel: the SAP model
         :param Iteration: the iteration is curnently being run
         :param Population: the index in the population being run
         """
 
-        OutputPath = 'C:\\Users\\blake\\OneDrive\\Desktop\\Sap2000CodeOutput\\Save_' + str(Iteration) + "_" + str(
-            Population)
+        OutputPath = os.path.join(self.SaveDirectory, 'Save_' + str(Iteration) + "_" + str(Population))
         ret = SapModel.File.Save(OutputPath)
 
     def solve(self, SapModel, CantileverPoint, Iteration, Population):
@@ -277,65 +471,62 @@ class Truss:
         """
 
         # run model (this will create the analysis model)
-        ret = SapModel.Analyze.RunAnalysis()
-
-        # get preload results
-        preLoadResults = self.getLoadCasesVerticalResults(SapModel, self.preLoadNames)
-        print(preLoadResults)
-        # get mainspan load results
-        mainSpanLoadResults = self.getLoadCasesVerticalResults(SapModel, self.MainSpanNames)
-        print(mainSpanLoadResults)
-        # get cantilver load results
-        cantilverLoadResults = self.getLoadCasesVerticalResults(SapModel, self.CantileverNames)
-        print(cantilverLoadResults)
-
-        mainSpanDisplacement = []
-        cantileverDisplacement = []
-        for i in range(len(preLoadResults)):
-            cantileverDisplacement.append(cantilverLoadResults[i][CantileverPoint] - preLoadResults[i][CantileverPoint])
-            caseMainDisplacement = []
-            for j in range(len(preLoadResults[i])):
-                caseMainDisplacement.append(mainSpanLoadResults[i][j] - preLoadResults[i][j])
-            mainSpanDisplacement.append(max(caseMainDisplacement))
-
-        mainDisplacementMax = max(mainSpanDisplacement)
-        cantileverDisplacementMax = max(cantileverDisplacement)
+        with self.phase('solve'):
+            ret = SapModel.Analyze.RunAnalysis()
+
+        with self.phase('results'):
+            # vertical displacements of every load case in one fetch
+            NumCases = len(self.preLoadNames)
+            vertical = self.getVerticalResults(SapModel, self.preLoadNames + self.MainSpanNames +
+                                               self.CantileverNames)
+            preLoadResults = vertical[:NumCases]
+            mainSpanLoadResults = vertical[NumCases:2 * NumCases]
+            cantilverLoadResults = vertical[2 * NumCases:]
+
+        if self.Verbose:
+            print(preLoadResults)
+            print(mainSpanLoadResults)
+            print(cantilverLoadResults)
+
+        mainDisplacementMax, cantileverDisplacementMax = self.displacementMaxima(
+            preLoadResults, mainSpanLoadResults, cantilverLoadResults, CantileverPoint)
 
         massOfTruss = self.getMass(SapModel)
 
         self.saveResults(Iteration, Population, mainDisplacementMax, cantileverDisplacementMax, massOfTruss)
         return mainDisplacementMax, cantileverDisplacementMax, massOfTruss
 
-    def getLoadCasesVerticalResults(self, SapModel, ListLoadCasses):
+    def displacementMaxima(self, preLoadResults, mainSpanLoadResults, cantilverLoadResults, CantileverPoint):
         """
-        gets the list of vertical displacements for that type of load cases
+        Takes the preload off the vertical displacements of the main span and cantilever load cases
 
-        :param SapModel: the SAP model
-        :param ListLoadCasses: list of load case names in the type
-        :return: 3D list of vertical displacements
+        :param preLoadResults: vertical displacement of each node in each preload case, [NumCases, NumNodes]
+        :param mainSpanLoadResults: vertical displacement of each node in each main span load case
+        :param cantilverLoadResults: vertical displacement of each node in each cantilever load case
+        :param CantileverPoint: the point at witch the displacement for the cantilever is to be mesured
+        :return: mainDisplacementMax, cantileverDisplacementMax
         """
+        preLoadResults = np.asarray(preLoadResults)
+        mainDisplacementMax = (np.asarray(mainSpanLoadResults) - preLoadResults).max()
+        cantileverDisplacementMax = (np.asarray(cantilverLoadResults)[:, CantileverPoint]
+                                     - preLoadResults[:, CantileverPoint]).max()
+        return mainDisplacementMax, cantileverDisplacementMax
 
-        LoadCaseResults = []
-        for i in range(len(ListLoadCasses)):
-            ret = SapModel.Results.Setup.DeselectAllCasesAndCombosForOutput()
-            ret = SapModel.Results.Setup.SetCaseSelectedForOutput(ListLoadCasses[i])
-
-            LoadDisplacement = []
-            for j in range(len(self.nodes)):
-                LoadDisplacement.append(self.getVerticalDisp(SapModel, j))
-            LoadCaseResults.append(LoadDisplacement)
-        return LoadCaseResults
-
-    def getVerticalDisp(self, SapModel, i):
+    def getVerticalResults(self, SapModel, ListLoadCasses):
         """
-        Gets the vertical displacement from a node
+        Gets the vertical displacement of every node in every load case with a single query of the joints in the
+        group ALL
 
         :param SapModel: the SAP model
-        :param i: the index of the node
-        :return: the vertical displacement
+        :param ListLoadCasses: names of the load cases
+        :return: vertical displacements, [NumCases, NumNodes]
         """
 
-        ObjectElm = 0
+        ret = SapModel.Results.Setup.DeselectAllCasesAndCombosForOutput()
+        for name in ListLoadCasses:
+            ret = SapModel.Results.Setup.SetCaseSelectedForOutput(name)
+
+        GroupElm = 2
         NumberResults = 0
         Obj = []
         Elm = []
@@ -349,9 +540,17 @@ class Truss:
         R2 = []
         R3 = []
         [NumberResults, Obj, Elm, LoadCase, StepType, StepNum, U1, U2, U3, R1, R2, R3,
-         ret] = SapModel.Results.JointDispl(self.nodeNames[i], ObjectElm, NumberResults, Obj, Elm, LoadCase, StepType,
-                                            StepNum, U1, U2, U3, R1, R2, R3)
-        return U3[0]
+         ret] = SapModel.Results.JointDispl("ALL", GroupElm, NumberResults, Obj, Elm, LoadCase, StepType, StepNum,
+                                            U1, U2, U3, R1, R2, R3)
+
+        caseIndex = {name: i for i, name in enumerate(ListLoadCasses)}
+        nodeIndex = {name: i for i, name in enumerate(self.nodeNames)}
+        cases = np.array([caseIndex[name] for name in LoadCase[:NumberResults]], dtype=int)
+        nodes = np.array([nodeIndex[name] for name in Obj[:NumberResults]], dtype=int)
+
+        results = np.zeros([len(ListLoadCasses), len(self.nodes)])
+        results[cases, nodes] = U3[:NumberResults]
+        return results
 
     def getMass(self, SapModel):
         a = 1
@@ -370,15 +569,17 @@ class Truss:
         return 1
 
 
-# test
-bridgeLength = 276
-stringerElevation = 25.5
-iteration = 1
-population = 1
-cantileverPoint = 8
-
-T = Truss(bridgeLength, stringerElevation, cantileverPoint)
-TStart = time.time()
-T.anaylize(["R1"], iteration, population)
-TEnd = time.time()
-print(TEnd - TStart)
+if __name__ == "__main__":
+    # test
+    bridgeLength = 276
+    stringerElevation = 25.5
+    iteration = 1
+    population = 1
+    cantileverPoint = 8
+
+    T = Truss(bridgeLength, stringerElevation, cantileverPoint)
+    TStart = time.time()
+    T.anaylize(["R1"], iteration, population)
+    TEnd = time.time()
+    print(TEnd - TStart)
+    T.close()
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class SectionCatalog:
+    def __init__(self, Areas, WeightPerLength=None, Names=None):
+        """
+        A list of the sections that can be bought, sorted by area so neighbouring indices are similar sections
+
+        :param Areas: cross-section area of each section
+        :param WeightPerLength: weight per unit length of each section, None to use the truss density
+        :param Names: name of each section
+        """
+        order = np.argsort(Areas, kind='stable')
+        self.Areas = np.asarray(Areas, dtype=float)[order]
+        self.WeightPerLength = None if WeightPerLength is None else np.asarray(WeightPerLength, dtype=float)[order]
+        self.Names = [str(i) for i in order] if Names is None else [Names[i] for i in order]
+        self.NumSections = len(self.Areas)
+
+    @staticmethod
+    def readIn(path):
+        """
+        Reads a catalog from an Excel file with an 'Area' column and optional 'WeightPerLength' and 'Name' columns
+
+        :param path: path of the Excel file
+        :return: the catalog
+        """
+        import pandas as pd
+
+        SectionsXlsx = pd.read_excel(path)
+        WeightPerLength = SectionsXlsx['WeightPerLength'].to_numpy() if 'WeightPerLength' in SectionsXlsx else None
+        Names = list(SectionsXlsx['Name']) if 'Name' in SectionsXlsx else None
+        return SectionCatalog(SectionsXlsx['Area'].to_numpy(), WeightPerLength, Names)
+
+    def index(self, position):
+        """
+        Rounds continuous search positions to section indices
+
+        :param position: positions in [0, NumSections - 1]
+        :return: section indices
+        """
+        return np.clip(np.rint(position), 0, self.NumSections - 1).astype(int)
+
+    def Lookup(self, position):
+        """
+        Looks up the properties of the sections at the given positions
+
+        :param position: positions in [0, NumSections - 1]
+        :return: cross-section areas and weights per length (None if the catalog has no weights)
+        """
+        index = self.index(position)
+        if self.WeightPerLength is None:
+            return self.Areas[index], None
+        return self.Areas[index], self.WeightPerLength[index]
@@ -1,5 +1,46 @@
 import numpy as np
-from matplotlib import pyplot as plt
+
+from . import Profiler
+
+try:
+    import scipy.linalg as sla
+    import scipy.sparse as sp
+    import scipy.sparse.linalg as spla
+    from scipy.sparse.csgraph import reverse_cuthill_mckee
+except ImportError:
+    sp = None
+
+try:
+    from sksparse import cholmod
+    sparseFactorErrors = (RuntimeError, cholmod.CholmodError)
+except ImportError:
+    cholmod = None
+    sparseFactorErrors = (RuntimeError,)
+
+
+class SingularStiffness(np.linalg.LinAlgError):
+    """
+    Raised when the free-DOF stiffness matrix of a truss is singular or nearly singular
+    """
+
+
+def triangularSolve(L, b, transpose=False):
+    """
+    Solves L x = b by substitution, for when scipy is not installed
+
+    :param L: lower triangular matrix
+    :param b: right-hand side, shape [n] or [n, k]
+    :param transpose: if True solves L^T x = b instead
+    :return: x
+    """
+    x = np.array(b, dtype=float)
+    if transpose:
+        for i in reversed(range(len(L))):
+            x[i] = (x[i] - L[i + 1:, i] @ x[i + 1:]) / L[i, i]
+    else:
+        for i in range(len(L)):
+            x[i] = (x[i] - L[i, :i] @ x[:i]) / L[i, i]
+    return x
 
 
 class Truss:
@@ -9,35 +50,67 @@ class Truss:
         self.membersCrossSectionGroup = []
         self.E = 1e4  # elasic modules
         self.p = 0.1  # density
+        self.DOF = 2  # degrees of freedom per node, 3 for a space truss, set from the nodes by startAnalysis
+
+        self.Solver = 'auto'  # 'dense', 'sparse' or 'auto'
+        self.SparseThreshold = 500  # number of free DOFs from which 'auto' uses the sparse solver
+        self.SingularTolerance = 1e-12  # smallest Cholesky pivot, relative to the stiffness diagonal
+
+        self.Factor = None  # solve function of the last single analysis
+        self.Feasible = None  # whether the last analysed structures were stable
+        self.SingularSolves = 0
+        self.Profiler = Profiler.Profiler(Enabled=False)  # replace or enable to time the analyses
 
         self.PointForces = []
+        self.LoadCases = {}  # name -> point forces of the load case
+        self.LoadCombinations = {}  # name -> {load case name: factor}
         self.Suports = []
+        self.Catalog = None  # SectionCatalog used by discrete analyses
 
         self.nodes = None
         self.bars = None
         self.P = None
         self.DOFCON = None
 
-    def addPointForce(self, Node, Direction, Magnitude):
+    def addPointForce(self, Node, Direction, Magnitude, LoadCase=None):
         """
         Adds a point load to a node
 
         :param Node: Number of node starting at 0
-        :param Direction: (0=x,1=y)
+        :param Direction: (0=x,1=y,2=z)
         :param Magnitude: Magnitude of the load
+        :param LoadCase: name of the load case the load is in, None for the default loads used by Analysis
+        """
+        if LoadCase is None:
+            self.PointForces.append([Node, Direction, Magnitude])
+        else:
+            self.LoadCases.setdefault(LoadCase, []).append([Node, Direction, Magnitude])
+
+    def addLoadCombination(self, Name, Factors):
         """
-        self.PointForces.append([Node, Direction, Magnitude])
+        Adds a load combination. If no combinations are added every load case is its own combination
+
+        :param Name: name of the combination
+        :param Factors: {load case name: factor}, the default loads are the load case 'Default'
+        """
+        self.LoadCombinations[Name] = dict(Factors)
 
     def addSuport(self, Node, Type):
         """
         Adds a support to a node
         :param Node:  Number of node starting at 0
-        :param Type: (0 = pined, 1 = free)
+        :param Type: (0 = pined, 1 = free, 2 = roller, free in x and z), or the [x, y] or [x, y, z] condition of the
+            node with 1 = free and 0 = fixed
         """
-        if Type == 0:
-            self.Suports.append([Node, 0,0])
+        if np.ndim(Type):
+            Type = list(Type)
+            self.Suports.append([Node] + Type + [1] * (3 - len(Type)))
+        elif Type == 0:
+            self.Suports.append([Node, 0,0,0])
         elif Type == 1:
-            self.Suports.append([Node, 1,1])
+            self.Suports.append([Node, 1,1,1])
+        elif Type == 2:
+            self.Suports.append([Node, 1,0,1])
 
 
     def addMember(self, Nodes, corssSectionGroup):
@@ -52,70 +125,524 @@ class Truss:
     def addNode(self, cords):
         """
         Adds a node
-        :param cords: [x,y]
+        :param cords: [x,y], or [x,y,z] for a space truss
         """
         self.n.append(cords)
 
+    def setModel(self, nodes, bars, groups=None, supports=None, forces=None):
+        """
+        Sets the whole model from arrays at once instead of one addNode, addMember, addSuport or addPointForce call
+        per row. It replaces the nodes, members, supports and default loads, and they can not be added to afterwards
+        :param nodes: [x,y] of each node, shape [NumNodes, DOF], or [x,y,z] of each node for a space truss
+        :param bars: [node 1, node 2] of each member, shape [NumMembers, 2]
+        :param groups: cross-section group of each member, defaults to one group per member
+        :param supports: [Node, x, y] or [Node, x, y, z] rows like the ones addSuport adds (1 = free, 0 = fixed)
+        :param forces: [Node, Direction, Magnitude] rows of the default loads
+        """
+        self.n = np.asarray(nodes, dtype=float)
+        self.m = np.asarray(bars, dtype=int)
+        self.membersCrossSectionGroup = np.arange(len(self.m)) if groups is None else np.asarray(groups, dtype=int)
+        self.Suports = np.zeros([0, 4], dtype=int) if supports is None else np.asarray(supports, dtype=int)
+        self.PointForces = np.zeros([0, 3]) if forces is None else np.asarray(forces, dtype=float)
+
     def startAnalysis(self):
         self.nodes = np.array(self.n).astype(float)
+        self.DOF = self.nodes.shape[1]
         self.bars = np.array(self.m)
+        self.groups = np.array(self.membersCrossSectionGroup)
 
         # Applied forces
         self.P = np.zeros_like(self.nodes)
-        for i in range(len(self.PointForces)):
-            self.P[self.PointForces[i][0], self.PointForces[i][1]] = self.PointForces[i][2]
+        forces = np.array(self.PointForces, dtype=float).reshape(-1, 3)
+        self.P[forces[:, 0].astype(int), forces[:, 1].astype(int)] = forces[:, 2]
+
+        # Load cases, the default loads are the case 'Default'
+        cases = dict(self.LoadCases)
+        if len(self.PointForces) or not cases:
+            cases = {'Default': self.PointForces, **cases}
+        self.LoadCaseNames = list(cases)
+        self.PCases = np.zeros((len(cases),) + self.nodes.shape)
+        for c, name in enumerate(self.LoadCaseNames):
+            forces = np.array(cases[name], dtype=float).reshape(-1, 3)
+            self.PCases[c, forces[:, 0].astype(int), forces[:, 1].astype(int)] = forces[:, 2]
 
-        # Condition of DOF (1 = free, 0 = fixed)
+        # Load combinations as factors of the load cases [NumLoadCases, NumCombinations]
+        if self.LoadCombinations:
+            self.CombinationNames = list(self.LoadCombinations)
+            self.CombinationFactors = np.zeros([len(cases), len(self.CombinationNames)])
+            for j, name in enumerate(self.CombinationNames):
+                for case, factor in self.LoadCombinations[name].items():
+                    self.CombinationFactors[self.LoadCaseNames.index(case), j] = factor
+        else:
+            self.CombinationNames = list(self.LoadCaseNames)
+            self.CombinationFactors = np.eye(len(cases))
+
+        # Condition of DOF (1 = free, 0 = fixed), directions a support row does not give are free
         self.DOFCON = np.ones_like(self.nodes).astype(int)
 
-        for i in range(len(self.Suports)):
-            self.DOFCON[self.Suports[i][0], 0] = self.Suports[i][1]
-            self.DOFCON[self.Suports[i][0], 1] = self.Suports[i][2]
+        Suports = np.array(self.Suports, dtype=int)
+        Suports = Suports.reshape(len(Suports), -1) if len(Suports) else np.zeros([0, 4], dtype=int)
+        given = min(self.DOF, Suports.shape[1] - 1)
+        self.DOFCON[Suports[:, 0], :given] = Suports[:, 1:given + 1]
+
+        self.precomputeGeometry()
 
-    def Analysis(self, A):
+    def precomputeGeometry(self):
+        """
+        Computes everything in the analysis that does not depend on the cross-section areas: member lengths,
+        direction cosines, unit stiffness blocks and the scatter indices of those blocks into the free-DOF
+        stiffness matrix
+        """
         NN = len(self.nodes)
         NE = len(self.bars)
-        DOF = 2
-        NDOF = DOF * NN
+        self.DOF = self.nodes.shape[1]
+        self.NDOF = self.DOF * NN
 
-        # structural analysis
         d = self.nodes[self.bars[:, 1], :] - self.nodes[self.bars[:, 0], :]
-        L = np.sqrt((d ** 2).sum(axis=1))
-        angle = d.T / L
-        a = np.concatenate((-angle.T, angle.T), axis=1)
-        K = np.zeros([NDOF, NDOF])
-        for k in range(NE):
-            aux = 2 * self.bars[k, :]
-            index = np.r_[aux[0]:aux[0] + 2, aux[1]:aux[1] + 2]
-
-            ES = np.dot(a[k][np.newaxis].T * self.E * A[k], a[k][np.newaxis]) / L[k]
-            K[np.ix_(index, index)] = K[np.ix_(index, index)] + ES
-
-        freeDOF = self.DOFCON.flatten().nonzero()[0]
-        supportDOF = (self.DOFCON.flatten() == 0).nonzero()[0]
-        Kff = K[np.ix_(freeDOF, freeDOF)]
-        Pf = self.P.flatten()[freeDOF]
-
-        Uf = np.linalg.solve(Kff, Pf)
-        U = self.DOFCON.astype(float).flatten()
-        U[freeDOF] = Uf
-        U[supportDOF] = [0,0,0,0]
-        U = U.reshape(NN, DOF)
-        u = np.concatenate((U[self.bars[:, 0]], U[self.bars[:, 1]]), axis=1)
-        N = self.E * A[:] / L[:] * (a[:] * u[:]).sum(axis=1)
-        S = N / A
-        Mass = (self.p * A * L).sum()
+        self.L = np.sqrt((d ** 2).sum(axis=1))
+        angle = d.T / self.L
+        self.a = np.concatenate((-angle.T, angle.T), axis=1)
+
+        # cross-section group of each member, numbered from 0 in the order of the group numbers
+        self.groupIds, self.groupIndex = np.unique(self.groups, return_inverse=True)
+        self.groupIndex = self.groupIndex.ravel()
+        self.NumGroups = len(self.groupIds)
+
+        # stiffness of each member for a unit cross-section area
+        self.unitStiffness = (self.E * self.a[:, :, np.newaxis] * self.a[:, np.newaxis, :]
+                              / self.L[:, np.newaxis, np.newaxis])
+
+        self.freeDOF = self.DOFCON.flatten().nonzero()[0]
+        self.supportDOF = (self.DOFCON.flatten() == 0).nonzero()[0]
+        self.NumFree = len(self.freeDOF)
+        self.Pf = self.P.flatten()[self.freeDOF]
+        self.PfCases = self.PCases.reshape(len(self.PCases), -1)[:, self.freeDOF].T
+
+        # global DOF -> position in the free DOFs (-1 for supported DOFs)
+        freeIndex = -np.ones(self.NDOF, dtype=int)
+        freeIndex[self.freeDOF] = np.arange(self.NumFree)
+        memberDOF = (self.DOF * self.bars[:, :, np.newaxis] + np.arange(self.DOF)).reshape(NE, 2 * self.DOF)
+        self.memberFree = freeIndex[memberDOF]
+        rows = self.memberFree[:, :, np.newaxis]
+        cols = self.memberFree[:, np.newaxis, :]
+        mask = (rows >= 0) & (cols >= 0)
+
+        # flattened Kff entry, owning member and unit stiffness of every block term that lands in Kff
+        self.scatterIndex = np.broadcast_to(rows * self.NumFree + cols, mask.shape)[mask]
+        self.scatterMember = np.broadcast_to(np.arange(NE)[:, np.newaxis, np.newaxis], mask.shape)[mask]
+        self.scatterValue = self.unitStiffness[mask]
+
+        if self.Solver == 'sparse' or (self.Solver == 'auto' and self.NumFree >= self.SparseThreshold):
+            if sp is None:
+                if self.Solver == 'sparse':
+                    raise ImportError("The sparse solver needs scipy")
+                self.useSparse = False
+            else:
+                self.useSparse = True
+                self.precomputeSparsity()
+        else:
+            self.useSparse = False
+
+    def precomputeSparsity(self):
+        """
+        Analyses the sparsity pattern of Kff once. The pattern only depends on the bars and the supports, so the
+        fill-reducing ordering, the CSC structure and the symbolic factorization are reused for every analysis
+        """
+        nf = self.NumFree
+        pattern, slot = np.unique(self.scatterIndex, return_inverse=True)
+        rows, cols = pattern // nf, pattern % nf
+
+        # fill-reducing ordering
+        graph = sp.csr_matrix((np.ones(len(pattern)), (rows, cols)), shape=(nf, nf))
+        self.sparsePerm = reverse_cuthill_mckee(graph, symmetric_mode=True)
+        position = np.empty(nf, dtype=int)
+        position[self.sparsePerm] = np.arange(nf)
+        rows, cols = position[rows], position[cols]
+
+        # CSC structure of the permuted matrix and where each scatter term lands in its data array
+        order = np.lexsort((rows, cols))
+        dataPosition = np.empty(len(pattern), dtype=int)
+        dataPosition[order] = np.arange(len(pattern))
+        self.sparseIndices = rows[order]
+        self.sparseIndptr = np.concatenate(([0], np.cumsum(np.bincount(cols, minlength=nf))))
+        self.sparseSlot = dataPosition[slot.ravel()]
+        self.sparseNNZ = len(pattern)
+
+        # symbolic factorization
+        self.symbolicFactor = None
+        if cholmod is not None:
+            self.symbolicFactor = cholmod.analyze(self.assembleKffSparse(np.ones(len(self.bars))))
+
+    def assembleKffSparse(self, A):
+        """
+        Assembles the permuted free-DOF stiffness matrix in CSC format
+
+        :param A: cross-section areas, shape [NumMembers]
+        :return: Kff
+        """
+        with self.Profiler.phase('assembly'):
+            data = np.bincount(self.sparseSlot, weights=A[self.scatterMember] * self.scatterValue,
+                               minlength=self.sparseNNZ)
+            return sp.csc_matrix((data, self.sparseIndices, self.sparseIndptr), shape=(self.NumFree, self.NumFree))
+
+    def factorizeSparse(self, A):
+        """
+        Factorizes Kff with the sparse solver, reusing the precomputed ordering and symbolic factorization
+
+        :param A: cross-section areas, shape [NumMembers]
+        :return: a function solving Kff x = b for b of shape [NumFree] or [NumFree, k]
+        """
+        Kff = self.assembleKffSparse(A)
+        try:
+            with self.Profiler.phase('factorization'):
+                if self.symbolicFactor is not None:
+                    factor = self.symbolicFactor.cholesky(Kff)
+                    pivots = factor.D()
+                else:
+                    # without row pivoting the diagonal of U holds the pivots of the LDL^T factorization
+                    lu = spla.splu(Kff, permc_spec='NATURAL', diag_pivot_thresh=0, options={'SymmetricMode': True})
+                    factor = lu.solve
+                    pivots = lu.U.diagonal()
+        except sparseFactorErrors as error:
+            raise SingularStiffness(str(error))
+        if not pivots.min() > self.SingularTolerance * Kff.diagonal().max():
+            raise SingularStiffness("The stiffness matrix is nearly singular")
+
+        def solve(b):
+            with self.Profiler.phase('solve'):
+                y = factor(b[self.sparsePerm])
+            if not np.isfinite(y).all():
+                raise SingularStiffness("The stiffness matrix is singular")
+            x = np.empty_like(y)
+            x[self.sparsePerm] = y
+            return x
+
+        return solve
+
+    def cholesky(self, Kff):
+        """
+        Cholesky factorization of Kff that fails cleanly for a mechanism or a near singular structure
+
+        :param Kff: the free-DOF stiffness matrix
+        :return: the lower triangular factor
+        """
+        try:
+            with self.Profiler.phase('factorization'):
+                L = np.linalg.cholesky(Kff)
+        except np.linalg.LinAlgError:
+            raise SingularStiffness("The stiffness matrix is not positive definite, the truss is a mechanism")
+        if not self.wellConditioned(Kff, L):
+            raise SingularStiffness("The stiffness matrix is nearly singular")
+        return L
+
+    def choleskyBatch(self, Kff):
+        """
+        Cholesky factorizations of a stack of Kff matrices
+
+        :param Kff: the free-DOF stiffness matrices, shape [PopSize, NumFree, NumFree]
+        :return: the lower triangular factors and whether each structure is stable
+        """
+        with self.Profiler.phase('factorization'):
+            try:
+                L = np.linalg.cholesky(Kff)
+                feasible = np.ones(len(Kff), dtype=bool)
+            except np.linalg.LinAlgError:
+                # at least one of the structures is a mechanism, find which
+                L = np.zeros_like(Kff)
+                feasible = np.zeros(len(Kff), dtype=bool)
+                for i in range(len(Kff)):
+                    try:
+                        L[i] = np.linalg.cholesky(Kff[i])
+                        feasible[i] = True
+                    except np.linalg.LinAlgError:
+                        pass
+        return L, feasible & self.wellConditioned(Kff, L)
+
+    def wellConditioned(self, Kff, L):
+        """
+        Checks the pivots of Cholesky factors against the stiffness diagonal. A tiny pivot means the structure is
+        close to a mechanism, for example because a member was driven to a near-zero area
+
+        :param Kff: the free-DOF stiffness matrices, shape [..., NumFree, NumFree]
+        :param L: their Cholesky factors
+        :return: False where the smallest pivot is below SingularTolerance times the largest diagonal term
+        """
+        pivots = np.diagonal(L, axis1=-2, axis2=-1) ** 2
+        return pivots.min(axis=-1) > self.SingularTolerance * np.diagonal(Kff, axis1=-2, axis2=-1).max(axis=-1)
+
+    def choleskySolve(self, L, b):
+        """
+        Solves Kff x = b from the Cholesky factor of Kff
+
+        :param L: the lower triangular factor
+        :param b: right-hand side, shape [NumFree] or [NumFree, k]
+        :return: x
+        """
+        with self.Profiler.phase('solve'):
+            if sp is None:
+                return triangularSolve(L, triangularSolve(L, b), transpose=True)
+            return sla.cho_solve((L, True), b, check_finite=False)
+
+    def factorize(self, A):
+        """
+        Factorizes Kff so it can be solved against several right-hand sides, such as extra load cases or
+        sensitivities. Raises SingularStiffness if the truss is a mechanism
+
+        :param A: cross-section areas, shape [NumMembers]
+        :return: a function solving Kff x = b for b of shape [NumFree] or [NumFree, k]
+        """
+        if self.useSparse:
+            return self.factorizeSparse(A)
+        L = self.cholesky(self.assembleKff(A))
+        return lambda b: self.choleskySolve(L, b)
+
+    def solve(self, A, Pf):
+        """
+        Solves Kff Uf = Pf for one truss. The factorization is kept in self.Factor for later solves. A singular
+        structure gives NaN displacements and sets self.Feasible to False instead of raising
+
+        :param A: cross-section areas, shape [NumMembers]
+        :param Pf: free-DOF loads, shape [NumFree] or [NumFree, k]
+        :return: Uf
+        """
+        try:
+            self.Factor = self.factorize(A)
+            Uf = self.Factor(Pf)
+            self.Feasible = True
+        except SingularStiffness:
+            self.Factor = None
+            Uf = np.full(Pf.shape, np.nan)
+            self.Feasible = False
+            self.SingularSolves += 1
+            self.Profiler.count('singularSolves')
+        return Uf
+
+    def solveBatch(self, A, Pf):
+        """
+        Solves Kff Uf = Pf for a population of trusses. Singular structures give NaN displacements and are flagged
+        False in self.Feasible
+
+        :param A: cross-section areas, shape [PopSize, NumMembers]
+        :param Pf: free-DOF loads, shape [NumFree] or [NumFree, k]
+        :return: Uf, shape [PopSize, NumFree] or [PopSize, NumFree, k]
+        """
+        NP = len(A)
+        Uf = np.full((NP,) + Pf.shape, np.nan)
+        if self.useSparse:
+            feasible = np.zeros(NP, dtype=bool)
+            for i in range(NP):
+                try:
+                    Uf[i] = self.factorizeSparse(A[i])(Pf)
+                    feasible[i] = True
+                except SingularStiffness:
+                    pass
+        else:
+            L, feasible = self.choleskyBatch(self.assembleKffBatch(A))
+            for i in np.nonzero(feasible)[0]:
+                Uf[i] = self.choleskySolve(L[i], Pf)
+        self.Feasible = feasible
+        self.SingularSolves += NP - feasible.sum()
+        self.Profiler.count('singularSolves', int(NP - feasible.sum()))
+        return Uf
+
+    def memberVectors(self, members):
+        """
+        Builds the vectors b_k in free-DOF space for which each member's stiffness is A_k b_k b_k^T
+
+        :param members: indices of the members
+        :return: B, shape [NumFree, len(members)]
+        """
+        members = np.asarray(members, dtype=int)
+        B = np.zeros([self.NumFree, len(members)])
+        column, entry = np.nonzero(self.memberFree[members] >= 0)
+        scale = np.sqrt(self.E / self.L[members])
+        B[self.memberFree[members][column, entry], column] = self.a[members][column, entry] * scale[column]
+        return B
+
+    def assembleKff(self, A):
+        """
+        Assembles the free-DOF stiffness matrix
+
+        :param A: cross-section areas, shape [NumMembers]
+        :return: Kff
+        """
+        nf = self.NumFree
+        with self.Profiler.phase('assembly'):
+            return np.bincount(self.scatterIndex, weights=A[self.scatterMember] * self.scatterValue,
+                               minlength=nf * nf).reshape(nf, nf)
+
+    def assembleKffBatch(self, A):
+        """
+        Assembles the free-DOF stiffness matrices for a population of cross-section areas
+
+        :param A: cross-section areas, shape [PopSize, NumMembers]
+        :return: Kff, shape [PopSize, NumFree, NumFree]
+        """
+        NP = len(A)
+        nf = self.NumFree
+        with self.Profiler.phase('assembly'):
+            index = self.scatterIndex + (nf * nf) * np.arange(NP)[:, np.newaxis]
+            values = A[:, self.scatterMember] * self.scatterValue
+            return np.bincount(index.ravel(), weights=values.ravel(), minlength=NP * nf * nf).reshape(NP, nf, nf)
+
+    def expandGroupAreas(self, A):
+        """
+        Expands cross-section areas given per cross-section group to areas per member
+
+        :param A: cross-section areas, shape [..., NumGroups]
+        :return: cross-section areas, shape [..., NumMembers]
+        """
+        return np.asarray(A)[..., self.groupIndex]
+
+    def sectionProperties(self, A, Grouped=False, Discrete=False):
+        """
+        Finds the cross-section area and mass per length of every member
+
+        :param A: the design variables, cross-section areas or, if Discrete, positions in the section catalog
+        :param Grouped: if True A holds one value per cross-section group
+        :param Discrete: if True the sections are looked up in self.Catalog
+        :return: cross-section areas and masses per length, shape [..., NumMembers]
+        """
+        if Discrete:
+            A, MassPerLength = self.Catalog.Lookup(A)
+            if MassPerLength is None:
+                MassPerLength = self.p * A
+        else:
+            A = np.asarray(A, dtype=float)
+            MassPerLength = self.p * A
+        if Grouped:
+            A, MassPerLength = self.expandGroupAreas(A), self.expandGroupAreas(MassPerLength)
+        return A, MassPerLength
+
+    def recoverResults(self, Uf, MassPerLength):
+        """
+        Recovers the displacements, stresses and masses from the free-DOF displacements. Any leading axes are
+        treated as the population
+
+        :param Uf: free-DOF displacements, shape [..., NumFree]
+        :param MassPerLength: mass per length of every member, shape [..., NumMembers]
+        :return: stresses [..., NumMembers], masses [...], displacements [..., NumNodes, DOF]
+        """
+        with self.Profiler.phase('recovery'):
+            U = np.zeros(Uf.shape[:-1] + (self.NDOF,))
+            U[..., self.freeDOF] = Uf
+            U = U.reshape(Uf.shape[:-1] + (len(self.nodes), self.DOF))
+            u = np.concatenate((U[..., self.bars[:, 0], :], U[..., self.bars[:, 1], :]), axis=-1)
+            S = self.E / self.L * (self.a * u).sum(axis=-1)
+            Mass = (MassPerLength * self.L).sum(axis=-1)
         return S, Mass, U
 
+    def Analysis(self, A, Grouped=False, Discrete=False):
+        """
+        :param A: cross-section areas, shape [NumMembers], or [NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in self.Catalog instead of areas
+        :return: stresses [NumMembers], mass, displacements [NumNodes, DOF]
+        """
+        A, MassPerLength = self.sectionProperties(A, Grouped, Discrete)
+        Uf = self.solve(A, self.Pf)
+        self.Profiler.count('analyses')
+        return self.recoverResults(Uf, MassPerLength)
+
+    def AnalysisBatch(self, A, Grouped=False, Discrete=False):
+        """
+        Analyses a whole population of cross-section areas at once
+
+        :param A: cross-section areas, shape [PopSize, NumMembers], or [PopSize, NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in self.Catalog instead of areas
+        :return: stresses [PopSize, NumMembers], masses [PopSize], displacements [PopSize, NumNodes, DOF]
+        """
+        A, MassPerLength = self.sectionProperties(np.atleast_2d(A), Grouped, Discrete)
+        Uf = self.solveBatch(A, self.Pf)
+        self.Profiler.count('analyses', len(A))
+        return self.recoverResults(Uf, MassPerLength)
+
+    def AnalysisLoadCases(self, A, Grouped=False, Discrete=False):
+        """
+        Analyses every load combination. Kff is factorized once and all the load cases are solved as one
+        multi-column right-hand side
+
+        :param A: cross-section areas, shape [NumMembers], or [NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in self.Catalog instead of areas
+        :return: stresses [NumCombinations, NumMembers], mass, displacements [NumCombinations, NumNodes, DOF]
+        """
+        A, MassPerLength = self.sectionProperties(A, Grouped, Discrete)
+
+        UfCases = self.solve(A, self.PfCases)
+        Uf = (UfCases @ self.CombinationFactors).T
+        self.Profiler.count('analyses')
+
+        S, Mass, U = self.recoverResults(Uf, MassPerLength[np.newaxis])
+        return S, Mass[0], U
+
+    def AnalysisLoadCasesBatch(self, A, Grouped=False, Discrete=False):
+        """
+        Analyses every load combination for a whole population of cross-section areas at once
+
+        :param A: cross-section areas, shape [PopSize, NumMembers], or [PopSize, NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group
+        :param Discrete: if True A holds positions in self.Catalog instead of areas
+        :return: stresses [PopSize, NumCombinations, NumMembers], masses [PopSize],
+            displacements [PopSize, NumCombinations, NumNodes, DOF]
+        """
+        A, MassPerLength = self.sectionProperties(np.atleast_2d(A), Grouped, Discrete)
+        UfCases = self.solveBatch(A, self.PfCases)
+        Uf = np.swapaxes(UfCases @ self.CombinationFactors, 1, 2)
+        self.Profiler.count('analyses', len(A))
+
+        S, Mass, U = self.recoverResults(Uf, MassPerLength[:, np.newaxis])
+        return S, Mass[:, 0], U
+
+    def Sensitivities(self, A, Grouped=False):
+        """
+        Analyses the truss and computes the derivatives of the results with respect to the areas. Each member adds
+        A_k b_k b_k^T to the stiffness, so with the direct method dUf/dA_k = -Kff^-1 b_k (b_k . Uf), solved for all
+        the members at once against the same factorization as the analysis
+
+        :param A: cross-section areas, shape [NumMembers], or [NumGroups] if Grouped
+        :param Grouped: if True A holds one area per cross-section group and the derivatives are per group
+        :return: stresses [NumMembers], mass, displacements [NumNodes, DOF], and their derivatives
+            dS [NumMembers, NumVariables], dMass [NumVariables], dU [NumNodes, DOF, NumVariables]
+        """
+        A, MassPerLength = self.sectionProperties(A, Grouped)
+        NE = len(self.bars)
+
+        Uf = self.solve(A, self.Pf)
+        self.Profiler.count('analyses')
+        S, Mass, U = self.recoverResults(Uf, MassPerLength)
+        if not self.Feasible:
+            NV = self.NumGroups if Grouped else NE
+            return S, Mass, U, np.full([NE, NV], np.nan), np.full(NV, np.nan), np.full(U.shape + (NV,), np.nan)
+
+        B = self.memberVectors(np.arange(NE))
+        dUf = -self.Factor(B) * (B.T @ Uf)
+        dS = (np.sqrt(self.E / self.L)[:, np.newaxis] * B.T) @ dUf
+        dMass = self.p * self.L
+        dU = np.zeros([self.NDOF, NE])
+        dU[self.freeDOF] = dUf
+        dU = dU.reshape(U.shape + (NE,))
+
+        if Grouped:
+            G = np.eye(self.NumGroups)[self.groupIndex]
+            dS, dMass, dU = dS @ G, dMass @ G, dU @ G
+        return S, Mass, U, dS, dMass, dU
+
     def Plot(self, nodes, c, lt, lw, lg):
+        from matplotlib import pyplot as plt
+
+        ax = plt.gca()
         for i in range(len(self.bars)):
-            xi, xf, = nodes[self.bars[i, 0], 0], nodes[self.bars[i, 1], 0]
-            yi, yf, = nodes[self.bars[i, 0], 1], nodes[self.bars[i, 1], 1]
-            line, = plt.plot([xi, xf], [yi, yf], color=c, linestyle=lt, linewidth=lw)
+            line, = ax.plot(*nodes[self.bars[i]].T, color=c, linestyle=lt, linewidth=lw)
         line.set_label(lg)
-        plt.legend()
+        ax.legend()
 
     def Draw(self, Deformation, Scale):
+        from matplotlib import pyplot as plt
+
+        if self.DOF == 3:
+            plt.figure().add_subplot(projection='3d')
         self.Plot(self.nodes, 'gray', '--', 1, 'Undeformed')
         Dnodes = Deformation * Scale + self.nodes
         self.Plot(Dnodes, 'red', '-', 2, 'Deformed')
@@ -0,0 +1,226 @@
+import numpy as np
+
+from . import TrussAnalysis
+
+# kinds of member, used for the 'type' cross-section groups
+BottomChord, TopChord, Vertical, Diagonal, Bracing = 0, 1, 2, 3, 4
+
+
+def build(nodes, bars, kinds, supports, loaded, Load, Groups):
+    """
+    Makes a truss from the arrays of one of the families
+
+    :param nodes: [x,y] of each node, or [x,y,z] for a space truss
+    :param bars: [node 1, node 2] of each member
+    :param kinds: kind of each member (BottomChord, TopChord, Vertical, Diagonal or Bracing)
+    :param supports: [Node, x, y] or [Node, x, y, z] rows of the supports (1 = free, 0 = fixed)
+    :param loaded: nodes that get a vertical point load
+    :param Load: magnitude of the point loads
+    :param Groups: cross-section groups: 'member' for one per member, 'type' for one per kind of member or 'single'
+        for one for the whole truss
+    :return: the truss, ready to be analysed
+    """
+    bars = np.asarray(bars)
+    kinds = np.asarray(kinds)
+    if Groups == 'member':
+        groups = np.arange(len(bars))
+    elif Groups == 'type':
+        groups = np.unique(kinds, return_inverse=True)[1]
+    elif Groups == 'single':
+        groups = np.zeros(len(bars), dtype=int)
+    else:
+        raise ValueError("Groups must be 'member', 'type' or 'single', not %r" % (Groups,))
+
+    loaded = np.asarray(loaded, dtype=int)
+    forces = np.column_stack((loaded, np.ones(len(loaded)), np.full(len(loaded), Load)))
+
+    t = TrussAnalysis.Truss()
+    t.setModel(nodes, bars, groups, supports, forces)
+    t.startAnalysis()
+    return t
+
+
+def chords(Panels, PanelLength, Height, topOffset=0.0):
+    """
+    :return: the nodes of a bottom and a top chord with Panels + 1 nodes each (the top one Panels nodes if it is
+        offset), the bottom chord first
+    """
+    bottom = np.column_stack((np.arange(Panels + 1) * PanelLength, np.zeros(Panels + 1)))
+    numTop = Panels if topOffset else Panels + 1
+    top = np.column_stack(((np.arange(numTop) + topOffset) * PanelLength, np.full(numTop, Height)))
+    return np.concatenate((bottom, top))
+
+
+def simpleSupports(Panels):
+    """
+    :return: a pin at the left end of the bottom chord and a roller at the right end
+    """
+    return np.array([[0, 0, 0], [Panels, 1, 0]])
+
+
+def loadedNodes(Panels, LoadChord, supported, top):
+    """
+    :return: the nodes of the loaded chord that are not supported
+    """
+    nodes = top if LoadChord == 'top' else np.arange(Panels + 1)
+    return np.setdiff1d(nodes, supported)
+
+
+def panelMembers(Panels, fromTop):
+    """
+    Chords, verticals and one diagonal per panel of a truss whose top nodes are above the bottom nodes
+
+    :param Panels: number of panels
+    :param fromTop: for each panel, True if its diagonal runs from the top of its left vertical to the bottom of its
+        right one, False if it runs from the bottom of the left vertical to the top of the right one
+    :return: bars and kinds
+    """
+    i = np.arange(Panels)
+    top = Panels + 1 + np.arange(Panels + 1)
+    bars = np.concatenate((np.column_stack((i, i + 1)),
+                           np.column_stack((top[:-1], top[1:])),
+                           np.column_stack((np.arange(Panels + 1), top)),
+                           np.where(np.asarray(fromTop)[:, np.newaxis], np.column_stack((top[:-1], i + 1)),
+                                    np.column_stack((i, top[1:])))))
+    kinds = np.repeat([BottomChord, TopChord, Vertical, Diagonal], [Panels, Panels, Panels + 1, Panels])
+    return bars, kinds
+
+
+def Pratt(Panels, PanelLength=120.0, Height=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Simply supported Pratt truss, the diagonals run down towards the centre of the span
+
+    :param Panels: number of panels
+    :param PanelLength: length of each panel
+    :param Height: distance between the chords
+    :param Load: vertical point load on every free node of the loaded chord
+    :param LoadChord: 'bottom' or 'top'
+    :param Groups: 'member', 'type' or 'single', see build
+    :return: the truss, ready to be analysed
+    """
+    bars, kinds = panelMembers(Panels, 2 * np.arange(Panels) < Panels)
+    loaded = loadedNodes(Panels, LoadChord, [0, Panels], Panels + 1 + np.arange(Panels + 1))
+    return build(chords(Panels, PanelLength, Height), bars, kinds, simpleSupports(Panels), loaded, Load, Groups)
+
+
+def Howe(Panels, PanelLength=120.0, Height=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Simply supported Howe truss, the diagonals run up towards the centre of the span. See Pratt for the parameters
+    """
+    bars, kinds = panelMembers(Panels, 2 * np.arange(Panels) >= Panels)
+    loaded = loadedNodes(Panels, LoadChord, [0, Panels], Panels + 1 + np.arange(Panels + 1))
+    return build(chords(Panels, PanelLength, Height), bars, kinds, simpleSupports(Panels), loaded, Load, Groups)
+
+
+def Warren(Panels, PanelLength=120.0, Height=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Simply supported Warren truss without verticals. The top chord nodes are above the middle of the panels and
+    the diagonals alternate between them and the bottom chord nodes. See Pratt for the parameters
+    """
+    i = np.arange(Panels)
+    top = Panels + 1 + i
+    bars = np.concatenate((np.column_stack((i, i + 1)),
+                           np.column_stack((top[:-1], top[1:])),
+                           np.column_stack((i, top)),
+                           np.column_stack((top, i + 1))))
+    kinds = np.repeat([BottomChord, TopChord, Diagonal], [Panels, Panels - 1, 2 * Panels])
+    loaded = loadedNodes(Panels, LoadChord, [0, Panels], top)
+    return build(chords(Panels, PanelLength, Height, 0.5), bars, kinds, simpleSupports(Panels), loaded, Load,
+                 Groups)
+
+
+def KTruss(Panels, PanelLength=120.0, Height=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Simply supported K-truss. The interior verticals have a node at mid-height and the two diagonals of each panel
+    meet there, on the vertical nearer the centre of the span, so it needs at least 2 panels. See Pratt for the
+    parameters
+    """
+    if Panels < 2:
+        raise ValueError("Panels must be at least 2 for a K-truss, not %r" % (Panels,))
+    i = np.arange(Panels)
+    top = Panels + 1 + np.arange(Panels + 1)
+    interior = np.arange(1, Panels)
+    mid = 2 * Panels + 1 + interior  # the mid-height node of vertical k is mid[k - 1]
+    nodes = np.concatenate((chords(Panels, PanelLength, Height),
+                            np.column_stack((interior * PanelLength, np.full(Panels - 1, Height / 2)))))
+
+    # the vertical the diagonals of each panel meet at
+    meet = np.where(2 * i < Panels - 1, i + 1, i)
+    far = np.where(meet == i + 1, i, i + 1)
+    bars = np.concatenate((np.column_stack((i, i + 1)),
+                           np.column_stack((top[:-1], top[1:])),
+                           [[0, top[0]], [Panels, top[Panels]]],
+                           np.column_stack((interior, mid)),
+                           np.column_stack((mid, top[interior])),
+                           np.column_stack((far, mid[meet - 1])),
+                           np.column_stack((top[far], mid[meet - 1]))))
+    kinds = np.repeat([BottomChord, TopChord, Vertical, Diagonal], [Panels, Panels, 2 * Panels, 2 * Panels])
+    loaded = loadedNodes(Panels, LoadChord, [0, Panels], top)
+    return build(nodes, bars, kinds, simpleSupports(Panels), loaded, Load, Groups)
+
+
+def Cantilever(Panels, PanelLength=120.0, Height=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Cantilever truss pinned at both chords of its left end, the diagonals all run down towards the free end. See
+    Pratt for the parameters
+    """
+    bars, kinds = panelMembers(Panels, np.ones(Panels, dtype=bool))
+    supports = np.array([[0, 0, 0], [Panels + 1, 0, 0]])
+    loaded = loadedNodes(Panels, LoadChord, [0, Panels + 1], Panels + 1 + np.arange(Panels + 1))
+    return build(chords(Panels, PanelLength, Height), bars, kinds, supports, loaded, Load, Groups)
+
+
+def Bridge(Panels, Spans=3, PanelLength=120.0, Height=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Continuous bridge truss over several spans of Pratt panels. The bottom chord is pinned at the left abutment
+    and sits on rollers at the piers and the right abutment
+
+    :param Panels: number of panels in each span
+    :param Spans: number of spans
+    :return: the truss, ready to be analysed. See Pratt for the other parameters
+    """
+    total = Panels * Spans
+    local = np.arange(total) % Panels  # position of each panel in its span
+    bars, kinds = panelMembers(total, 2 * local < Panels)
+    top = total + 1 + np.arange(total + 1)
+
+    piers = np.arange(Spans + 1) * Panels
+    supports = np.column_stack((piers, np.ones(Spans + 1, dtype=int), np.zeros(Spans + 1, dtype=int)))
+    supports[0, 1] = 0
+    loaded = loadedNodes(total, LoadChord, piers, top)
+    return build(chords(total, PanelLength, Height), bars, kinds, supports, loaded, Load, Groups)
+
+
+def SpacePratt(Panels, PanelLength=120.0, Height=120.0, Width=120.0, Load=-10.0, LoadChord='bottom', Groups='type'):
+    """
+    Space truss of two Pratt trusses Width apart in z, joined by struts at every node, lateral bracing in the planes
+    of the bottom and top chords and a portal brace at each end. One truss is pinned at its left end and both sit on
+    rollers elsewhere, with the right end of the pinned truss also held in z
+
+    :param Width: distance between the two trusses
+    :return: the space truss, ready to be analysed. See Pratt for the other parameters
+    """
+    plane = chords(Panels, PanelLength, Height)
+    NumPlane = len(plane)
+    nodes = np.concatenate((np.column_stack((plane, np.zeros(NumPlane))),
+                            np.column_stack((plane, np.full(NumPlane, Width)))))
+
+    bars, kinds = panelMembers(Panels, 2 * np.arange(Panels) < Panels)
+    i = np.arange(Panels)
+    top = Panels + 1 + np.arange(Panels + 1)
+    ends = np.array([0, Panels])
+    bars = np.concatenate((bars, bars + NumPlane,
+                           np.column_stack((np.arange(NumPlane), np.arange(NumPlane) + NumPlane)),
+                           np.column_stack((i, i + 1 + NumPlane)),
+                           np.column_stack((top[:-1], top[1:] + NumPlane)),
+                           np.column_stack((ends, top[ends] + NumPlane))))
+    kinds = np.concatenate((kinds, kinds, np.full(NumPlane + 2 * Panels + 2, Bracing)))
+
+    supports = np.array([[0, 0, 0, 0], [Panels, 1, 0, 0], [NumPlane, 1, 0, 1], [Panels + NumPlane, 1, 0, 1]])
+    loaded = loadedNodes(Panels, LoadChord, [0, Panels], top)
+    loaded = np.concatenate((loaded, loaded + NumPlane))
+    return build(nodes, bars, kinds, supports, loaded, Load, Groups)
+
+
+Families = {'Pratt': Pratt, 'Howe': Howe, 'Warren': Warren, 'KTruss': KTruss, 'Cantilever': Cantilever,
+            'Bridge': Bridge, 'SpacePratt': SpacePratt}
@@ -0,0 +1,5 @@
+"""
+Truss analysis and cross-section optimization. Importing the package or any of its modules does no work and does
+not import matplotlib or pandas, those are only loaded when plotting or reading Excel files. Run
+`python -m Optimize --help` for the command line interface
+"""
@@ -0,0 +1,3 @@
+from .CLI import main
+
+main()
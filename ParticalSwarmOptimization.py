@@ -1,6 +1,5 @@
 #Import librarys
 import numpy as np
-import matplotlib.pyplot as plt
 
 #Sphere function
 def Sphere(x):
@@ -67,6 +66,8 @@ def Optimization():
                 self.BestCost[it] = self.gbest_cost
 
         def Plot(self):
+            import matplotlib.pyplot as plt
+
             plt.semilogy(self.BestCost)
             #plt.ylim([10e-120, 10e20])
             #plt.xlim([0, 3000])
@@ -80,7 +81,8 @@ def Optimization():
     a.Plot()
 
 #%% Run
-Optimization()
+if __name__ == "__main__":
+    Optimization()
 
 
 
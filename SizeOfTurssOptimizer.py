@@ -1,11 +1,19 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+from Optimize import CostFunction
+
+try:
+    import scipy.linalg as sla
+except ImportError:
+    sla = None
 
 # %% Input truss structure data
 E = 1e4 # elasic modules
 p = 0.1 # density
 s_lim = 25 # stress limit
 d_lim = 2 # displacement limit
+SingularTolerance = 1e-12 # smallest Cholesky pivot, relative to the stiffness diagonal
+cost = CostFunction.CostFunction(s_lim)
 
 nodes = []
 bars = []
@@ -70,7 +78,18 @@ def TrussAnalysis(A):
     Kff = K[np.ix_(freeDOF, freeDOF)]
     Pf = P.flatten()[freeDOF]
 
-    Uf = np.linalg.solve(Kff, Pf)
+    # Kff is symmetric positive definite unless the truss is a mechanism, which is scored as infeasible, as is a
+    # truss so close to one that a Cholesky pivot is tiny
+    try:
+        Lc = np.linalg.cholesky(Kff)
+        if np.diagonal(Lc).min() ** 2 <= SingularTolerance * np.diagonal(Kff).max():
+            raise np.linalg.LinAlgError("Kff is nearly singular")
+        if sla is None:
+            Uf = np.linalg.solve(Kff, Pf)
+        else:
+            Uf = sla.cho_solve((Lc, True), Pf, check_finite=False)
+    except np.linalg.LinAlgError:
+        Uf = np.full(len(freeDOF), np.nan)
     U = DOFCON.astype(float).flatten()
     U[freeDOF] = Uf
     U[supportDOF] = Ur
@@ -130,26 +149,7 @@ def calcCost(weight, deflection, stress):
     :param stress: stresses in all the members of the truss
     :return: cost of the truss
     """
-
-    # adding cost if a member is exceding the stree limit
-    C_total = 0
-    for cd in range(NumMembers):
-        if np.abs(stress[cd]) > s_lim:
-            C1 = np.abs((stress[cd] - s_lim) / s_lim)
-        else:
-            C1 = 0
-        C_total = C_total + C1
-
-    # finding the maximum vertical deflection
-    maxDif = 0
-    for i in range(len(nodes)):
-        if np.abs(deflection[i, 1]) > maxDif:
-            maxDif = np.abs(deflection[i, 1])
-
-    # calculating cost
-    Cs = weight ** 1.8 * 75 + 0.95 * maxDif * 4000000
-
-    return Cs * (1+ C_total)
+    return cost.Evaluate(weight, deflection, stress)
 
 #%% Algorithm
 def Optimization():
@@ -218,6 +218,8 @@ def Optimization():
                 self.BestAreas[it] = self.gBestAreas
 
         def Plot(self):
+            import matplotlib.pyplot as plt
+
             plt.plot(self.BestCost)
             print("Design Variables A[in2]")
             print(self.BestAreas[-1][np.newaxis].T)
@@ -239,4 +241,5 @@ def Optimization():
     a.Plot()
 
 #%% Run
-Optimization()
+if __name__ == "__main__":
+    Optimization()
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 # %% Input truss structure data
 E = 1e4
@@ -91,6 +90,8 @@ def TrussAnalysis():
     return np.array(N), np.array(R), U
 
 def Plot(nodes, c, lt, lw, lg):
+    import matplotlib.pyplot as plt
+
     for i in range(len(bars)):
         xi, xf, = nodes[bars[i, 0], 0], nodes[bars[i, 1], 0]
         yi, yf, = nodes[bars[i, 0], 1], nodes[bars[i, 1], 1]
@@ -99,15 +100,18 @@ def Plot(nodes, c, lt, lw, lg):
     plt.legend()
 
 # %% Result
-N, R, U = TrussAnalysis()
-print('Axial Forces (positive = tension, negative = compression)')
-print(N)
-print('Reaction Forces (positive = upward, negative = downword)')
-print(R)
-print('Deformation at nodes')
-print(U)
-Plot(nodes, 'gray', '--', 1, 'Undeformed')
-scale = 1
-Dnodes = U * scale + nodes
-Plot(Dnodes, 'red', '-', 2, 'Deformed')
-plt.show()
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    N, R, U = TrussAnalysis()
+    print('Axial Forces (positive = tension, negative = compression)')
+    print(N)
+    print('Reaction Forces (positive = upward, negative = downword)')
+    print(R)
+    print('Deformation at nodes')
+    print(U)
+    Plot(nodes, 'gray', '--', 1, 'Undeformed')
+    scale = 1
+    Dnodes = U * scale + nodes
+    Plot(Dnodes, 'red', '-', 2, 'Deformed')
+    plt.show()
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+
+from Optimize import Benchmark
+from Optimize import IncrementalAnalysis
+from Optimize import TrussGenerator
+
+
+def assertSameResults(results, expected):
+    for r, e in zip(results, expected):
+        np.testing.assert_allclose(r, e, rtol=1e-7, atol=1e-9)
+
+
+class WoodburyUpdateTest(unittest.TestCase):
+    def compareRandomChanges(self, truss, MaxChanges, MostChanged, steps=60):
+        rng = np.random.default_rng(4)
+        incremental = IncrementalAnalysis.IncrementalAnalysis(truss, MaxChanges=MaxChanges)
+        A = rng.uniform(1, 10, len(truss.bars))
+        for step in range(steps):
+            changed = rng.choice(len(A), rng.integers(1, MostChanged + 1), replace=False)
+            A[changed] = rng.uniform(1, 10, len(changed))
+            assertSameResults(incremental.Analysis(A), truss.Analysis(A))
+            self.assertTrue(incremental.Feasible)
+        return incremental
+
+    def test_random_changes_match_full_analysis(self):
+        incremental = self.compareRandomChanges(Benchmark.tenBar(), MaxChanges=10, MostChanged=4)
+        self.assertEqual(incremental.refactorizations, 1)
+        self.assertEqual(incremental.updates, 59)
+
+    def test_random_changes_on_a_larger_truss(self):
+        incremental = self.compareRandomChanges(TrussGenerator.Pratt(12, Groups='member'), MaxChanges=5,
+                                                MostChanged=5, steps=30)
+        self.assertEqual(incremental.refactorizations + incremental.updates, 30)
+        self.assertGreater(incremental.updates, 0)
+
+    def test_too_many_changes_refactorize(self):
+        incremental = self.compareRandomChanges(Benchmark.tenBar(), MaxChanges=2, MostChanged=6)
+        self.assertGreater(incremental.refactorizations, 1)
+        self.assertGreater(incremental.updates, 0)
+        self.assertEqual(incremental.refactorizations + incremental.updates, 60)
+
+    def test_unchanged_areas_reuse_the_factorization(self):
+        truss = Benchmark.tenBar()
+        incremental = IncrementalAnalysis.IncrementalAnalysis(truss)
+        A = np.full(10, 5.0)
+        incremental.Analysis(A)
+        assertSameResults(incremental.Analysis(A.copy()), truss.Analysis(A))
+        self.assertEqual((incremental.refactorizations, incremental.updates), (1, 0))
+
+
+class NearZeroAreaTest(unittest.TestCase):
+    def test_redundant_member_dropping_to_zero(self):
+        truss = Benchmark.tenBar()
+        incremental = IncrementalAnalysis.IncrementalAnalysis(truss)
+        A = np.full(10, 5.0)
+        incremental.Analysis(A)
+        A[4] = 1e-13
+        assertSameResults(incremental.Analysis(A), truss.Analysis(A))
+        self.assertTrue(incremental.Feasible)
+
+    def test_mechanism_falls_back_to_a_checked_factorization(self):
+        truss = Benchmark.tenBar()
+        incremental = IncrementalAnalysis.IncrementalAnalysis(truss)
+        A = np.full(10, 5.0)
+        incremental.Analysis(A)
+        A[[0, 2]] = 1e-13
+        singular = truss.SingularSolves
+        U = incremental.Analysis(A)[2]
+        self.assertFalse(incremental.Feasible)
+        self.assertTrue(np.isnan(U).any())
+        self.assertEqual(incremental.updates, 0)
+        self.assertEqual(truss.SingularSolves, singular + 1)
+
+        # the next structure is factorized again rather than updated from the singular one
+        A[[0, 2]] = 5.0
+        assertSameResults(incremental.Analysis(A), truss.Analysis(A))
+        self.assertTrue(incremental.Feasible)
+        self.assertEqual(incremental.refactorizations, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from Optimize import Benchmark
+from Optimize import CostFunction
+from Optimize import Optimization
+
+
+def swarm(truss, **kwargs):
+    cost = CostFunction.CostFunction(15)  # a stricter stress limit than the 25 ksi the swarm is given
+    return Optimization.ParticalSwarmOptimization(10, 6, 10, 0.1, 35, 20, 12, 25, truss, Seed=3, Cost=cost,
+                                                  **kwargs)
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.npz')
+        self.truss = Benchmark.tenBar()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertResumedRunMatches(self, **kwargs):
+        uninterrupted = swarm(self.truss, **kwargs)
+        uninterrupted.Evaluate()
+
+        interrupted = swarm(self.truss, **kwargs)
+        interrupted.Evaluate(Callback=lambda it, run: it == 7, CheckpointPath=self.path, CheckpointEvery=5)
+        self.assertEqual(interrupted.StopReason, 'callback')
+
+        resumed = Optimization.ParticalSwarmOptimization.Resume(self.path, self.truss)
+        self.assertEqual(resumed.Iteration, 8)
+        self.assertEqual(resumed.Cost.StressLimit, 15)
+        resumed.Evaluate()
+
+        np.testing.assert_array_equal(resumed.BestCost, uninterrupted.BestCost)
+        np.testing.assert_array_equal(resumed.BestAreas, uninterrupted.BestAreas)
+        np.testing.assert_array_equal(resumed.Area, uninterrupted.Area)
+        self.assertEqual(resumed.NumAnalyses, uninterrupted.NumAnalyses)
+        self.assertEqual(os.listdir(self.directory.name), ['run.npz'])
+
+    def test_particles_one_at_a_time(self):
+        self.assertResumedRunMatches()
+
+    def test_synchronous(self):
+        self.assertResumedRunMatches(Synchronous=True)
+
+    def test_worker_processes(self):
+        self.assertResumedRunMatches(Workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
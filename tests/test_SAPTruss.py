@@ -0,0 +1,73 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from Optimize.SAP_OPTIMIZATION import FakeSAP
+from Optimize.SAP_OPTIMIZATION import Truss
+
+
+def analyse(truss, sections, iterations=1):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for it in range(iterations):
+            truss.anaylize(sections, it, 0)
+
+
+class PersistentModelTest(unittest.TestCase):
+    def setUp(self):
+        self.sap = FakeSAP.FakeSapObject()
+        self.truss = Truss.Truss(276, 25.5, 8, Persistent=True, SapObject=self.sap)
+        self.truss.CSGroup = np.arange(len(self.truss.members)) % 2
+
+    def test_model_is_built_once(self):
+        analyse(self.truss, ['R1', 'R1'], 3)
+        self.assertEqual(self.sap.count('SapModel.InitializeNewModel'), 1)
+        self.assertEqual(self.sap.count('SapModel.PointObj.AddCartesian'), len(self.truss.nodes))
+        self.assertEqual(self.sap.count('SapModel.FrameObj.AddByPoint'), len(self.truss.members))
+        self.assertEqual(self.sap.count('SapModel.LoadPatterns.Add'), 33)
+        self.assertEqual(self.sap.count('SapModel.Analyze.RunAnalysis'), 3)
+        self.assertEqual(len(self.truss.nodeNames), len(self.truss.nodes))
+        self.assertEqual(len(self.truss.memberNames), len(self.truss.members))
+
+    def test_only_changed_groups_get_new_sections(self):
+        analyse(self.truss, ['R1', 'R1'])
+        analyse(self.truss, ['R1', 'R1'])
+        self.assertEqual(self.sap.count('SapModel.FrameObj.SetSection'), 0)
+        analyse(self.truss, ['R1', 'R2'])
+        self.assertEqual(self.sap.arguments('SapModel.FrameObj.SetSection'), [('CSG1', 'R2', 1)])
+        self.assertEqual(self.sap.count('SapModel.SetModelIsLocked'), 2)
+
+    def test_rebuilt_model_keeps_names(self):
+        truss = Truss.Truss(276, 25.5, 8, SapObject=self.sap)
+        analyse(truss, ['R1'], 3)
+        self.assertEqual(self.sap.count('SapModel.InitializeNewModel'), 3)
+        self.assertEqual(len(truss.nodeNames), len(truss.nodes))
+        self.assertEqual(len(truss.memberNames), len(truss.members))
+
+
+class BulkResultsTest(unittest.TestCase):
+    def test_one_joint_query_per_analysis(self):
+        sap = FakeSAP.FakeSapObject()
+        truss = Truss.Truss(276, 25.5, 8, Persistent=True, SapObject=sap)
+        analyse(truss, ['R1'], 2)
+        calls = sap.arguments('SapModel.Results.JointDispl')
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(call[:2] == ('ALL', 2) for call in calls))
+
+    def test_results_are_unpacked_by_case_and_node(self):
+        sap = FakeSAP.FakeSapObject()
+        truss = Truss.Truss(276, 25.5, 8, Persistent=True, SapObject=sap)
+        analyse(truss, ['R1'])
+        cases = truss.preLoadNames + truss.MainSpanNames
+        results = truss.getVerticalResults(truss.SapModel, cases)
+        expected = [[sap.displacement(c, j) for j in range(len(truss.nodes))] for c in range(len(cases))]
+        np.testing.assert_array_equal(results, expected)
+
+        main, cantilever = truss.displacementMaxima(results[:11], results[11:], results[11:], truss.CantileverPoint)
+        self.assertAlmostEqual(main, -11.0)
+        self.assertAlmostEqual(cantilever, -11.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
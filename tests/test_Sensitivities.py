@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from Optimize import Benchmark
+from Optimize import GradientOptimization
+from Optimize import TrussGenerator
+
+
+def finiteDifferences(truss, A, Grouped, step=1e-6):
+    """
+    :return: central difference estimates of dS, dMass and dU, in the shapes Sensitivities returns them
+    """
+    dS, dMass, dU = [], [], []
+    for k in range(len(A)):
+        h = step * A[k]
+        up, down = A.copy(), A.copy()
+        up[k] += h
+        down[k] -= h
+        Sup, Mup, Uup = truss.Analysis(up, Grouped)
+        Sdown, Mdown, Udown = truss.Analysis(down, Grouped)
+        dS.append((Sup - Sdown) / (2 * h))
+        dMass.append((Mup - Mdown) / (2 * h))
+        dU.append((Uup - Udown) / (2 * h))
+    return np.stack(dS, axis=-1), np.array(dMass), np.stack(dU, axis=-1)
+
+
+class SensitivitiesTest(unittest.TestCase):
+    def assertMatchesFiniteDifferences(self, truss, A, Grouped):
+        S, Mass, U, dS, dMass, dU = truss.Sensitivities(A, Grouped)
+        np.testing.assert_allclose(S, truss.Analysis(A, Grouped)[0])
+
+        fdS, fdMass, fdU = finiteDifferences(truss, A, Grouped)
+        self.assertEqual(dS.shape, fdS.shape)
+        self.assertEqual(dU.shape, fdU.shape)
+        np.testing.assert_allclose(dS, fdS, rtol=1e-5, atol=1e-6 * np.abs(fdS).max())
+        np.testing.assert_allclose(dMass, fdMass, rtol=1e-6)
+        np.testing.assert_allclose(dU, fdU, rtol=1e-5, atol=1e-6 * np.abs(fdU).max())
+
+    def test_per_member(self):
+        truss = Benchmark.tenBar()
+        A = np.random.default_rng(1).uniform(1, 20, 10)
+        self.assertMatchesFiniteDifferences(truss, A, Grouped=False)
+
+    def test_grouped(self):
+        truss = TrussGenerator.Pratt(6, Groups='type')
+        self.assertLess(truss.NumGroups, len(truss.bars))
+        A = np.random.default_rng(2).uniform(1, 10, truss.NumGroups)
+        self.assertMatchesFiniteDifferences(truss, A, Grouped=True)
+
+    def test_mechanism_gives_nan(self):
+        truss = Benchmark.tenBar()
+        A = np.full(10, 5.0)
+        A[[0, 2]] = 1e-13
+        S, Mass, U, dS, dMass, dU = truss.Sensitivities(A)
+        self.assertFalse(truss.Feasible)
+        self.assertEqual(dS.shape, (10, 10))
+        self.assertTrue(np.isnan(dS).all() and np.isnan(dMass).all() and np.isnan(dU).all())
+
+
+class GradientSizingTest(unittest.TestCase):
+    def test_ten_bar_optimum(self):
+        optimizer = GradientOptimization.GradientSizingOptimization(Benchmark.tenBar(), 0.1, 35, 25, 2)
+        A = optimizer.Evaluate()
+        self.assertTrue(optimizer.Result.success)
+        self.assertAlmostEqual(optimizer.Mass, 5060.9, delta=0.5)
+        self.assertLessEqual(optimizer.NumAnalyses, 60)
+
+        # the known optimum has members 2, 5 and 10 at the minimum area
+        np.testing.assert_allclose(A[[1, 4, 9]], 0.1, atol=1e-6)
+        self.assertGreaterEqual(optimizer.constraints(A).min(), -1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
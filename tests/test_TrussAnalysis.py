@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from Optimize import Benchmark
+from Optimize import IncrementalAnalysis
+from Optimize import TrussGenerator
+
+
+def withSolver(truss, Solver):
+    truss.Solver = Solver
+    truss.precomputeGeometry()
+    return truss
+
+
+class SingularFeasibilityTest(unittest.TestCase):
+    def test_dense_and_sparse_agree_on_the_ten_bar(self):
+        A = np.full((3, 10), 5.0)
+        A[1, [4, 5, 8]] = 1e-13
+        for Solver in ('dense', 'sparse'):
+            truss = withSolver(Benchmark.tenBar(), Solver)
+            S, Mass, U = truss.Analysis(A[1])
+            self.assertFalse(truss.Feasible, Solver)
+            self.assertTrue(np.isnan(U).any(), Solver)
+
+            truss.AnalysisBatch(A)
+            np.testing.assert_array_equal(truss.Feasible, [True, False, True], Solver)
+
+    def test_large_truss_near_zero_member(self):
+        truss = TrussGenerator.Pratt(200, Groups='member')
+        self.assertTrue(truss.useSparse)
+        A = np.full(len(truss.bars), 5.0)
+        truss.Analysis(A)
+        self.assertTrue(truss.Feasible)
+
+        A[7] = 1e-14
+        sparse = truss.Analysis(A)[2]
+        self.assertFalse(truss.Feasible)
+        withSolver(truss, 'dense').Analysis(A)
+        self.assertFalse(truss.Feasible)
+        self.assertTrue(np.isnan(sparse).any())
+
+    def test_sparse_matches_dense(self):
+        truss = TrussGenerator.Pratt(20, Groups='member')
+        A = np.random.default_rng(0).uniform(1, 10, (4, len(truss.bars)))
+        dense = withSolver(truss, 'dense').AnalysisBatch(A)
+        sparse = withSolver(truss, 'sparse').AnalysisBatch(A)
+        for d, s in zip(dense, sparse):
+            np.testing.assert_allclose(s, d, rtol=1e-9, atol=1e-9)
+
+    def test_incremental_refactor_on_the_sparse_path(self):
+        truss = withSolver(Benchmark.tenBar(), 'sparse')
+        incremental = IncrementalAnalysis.IncrementalAnalysis(truss, MaxChanges=0)
+        A = np.full(10, 5.0)
+        incremental.Analysis(A)
+        A[[4, 5, 8]] = 1e-13
+        U = incremental.Analysis(A)[2]
+        self.assertFalse(incremental.Feasible)
+        self.assertTrue(np.isnan(U).any())
+
+
+class GeneratorTest(unittest.TestCase):
+    def test_k_truss_needs_two_panels(self):
+        with self.assertRaises(ValueError):
+            TrussGenerator.KTruss(1)
+        truss = TrussGenerator.KTruss(2)
+        truss.Analysis(np.full(truss.NumGroups, 5.0), Grouped=True)
+        self.assertTrue(truss.Feasible)
+
+
+if __name__ == '__main__':
+    unittest.main()